@@ -39,6 +39,28 @@ class TicketAnalysisApp:
             raise ValueError("No se encontro archivo manual del reporte comercial.")
         return self.data_loader.load(report_bytes), "manual"
 
+    def _report_source_key(self) -> tuple:
+        """Identify the current report source so the processed frame is rebuilt only when it changes."""
+        source = st.session_state.get("report_source", "manual")
+        if source == "freshdesk":
+            snapshot_path = self.config.freshdesk_snapshot_path
+            return source, snapshot_path.stat().st_mtime if snapshot_path.exists() else None
+        report_bytes = st.session_state.get("report_bytes")
+        return source, hash(report_bytes) if report_bytes else None
+
+    def _get_processed_report_df(self) -> tuple:
+        """Return the validated and preprocessed report, reusing the session copy across reruns."""
+        source_key = self._report_source_key()
+        cached_report = st.session_state.get("processed_report")
+        if cached_report is not None and cached_report[0] == source_key:
+            return cached_report[1], cached_report[2]
+
+        df, source_kind = self._get_report_df_from_source()
+        df = self.validator.validate_and_standardize(df)
+        df = self.preprocessor.preprocess(df)
+        st.session_state.processed_report = (source_key, df, source_kind)
+        return df, source_kind
+
     @staticmethod
     def _apply_readability_styles() -> None:
         """Apply global UI styles to improve readability."""
@@ -131,6 +153,7 @@ class TicketAnalysisApp:
                     st.session_state.uploader_key += 1
                     st.session_state.pop("report_bytes", None)
                     st.session_state.pop("logins_bytes", None)
+                    st.session_state.pop("processed_report", None)
                     st.rerun()
             else:
                 st.caption("Selecciona fuente para reporte comercial y carga el Excel de logins.")
@@ -202,16 +225,13 @@ class TicketAnalysisApp:
         usage_df = self.data_loader.load(logins_bytes)
 
         try:
-            df, source_kind = self._get_report_df_from_source()
+            df, source_kind = self._get_processed_report_df()
         except (FileNotFoundError, ValueError) as error:
             st.error(str(error))
             return
 
         if source_kind == "snapshot":
             st.caption("Fuente reporte comercial: Freshdesk sincronizado")
-
-        df = self.validator.validate_and_standardize(df)
-        df = self.preprocessor.preprocess(df)
         
         tab_soporte, tab_comercial = st.tabs(["Area Soporte", "Area Comercial"])
 
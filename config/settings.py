@@ -11,9 +11,13 @@ class AppConfig:
     REQUIRED_COLUMNS: List[str] = None
     DATETIME_COLUMNS: List[str] = None
     NUMERIC_COLUMNS: List[str] = None
+    CATEGORICAL_COLUMNS: List[str] = None
+    SECTION_COLUMNS: List[str] = None
     MONTH_NAMES_ES: Dict[int, str] = None
     RESOLVED_STATES: Set[str] = None
     PROD_ENVIRONMENTS: Set[str] = None
+    RESOLVED_FLAG_COLUMN: str = "Ticket Resuelto"
+    ESTADO_GROUPED_COLUMN: str = "Estado Agrupado"
     FRESHDESK_DOMAIN: Optional[str] = None
     FRESHDESK_API_KEY: Optional[str] = None
     FRESHDESK_PER_PAGE: int = 100
@@ -57,6 +61,21 @@ class AppConfig:
                 "Interacciones del agente", "Interacciones del cliente", "Esfuerzo en Horas",
             ]
         
+        if self.CATEGORICAL_COLUMNS is None:
+            self.CATEGORICAL_COLUMNS = [
+                "Tipo", "Grupo", "Team Asignado", "Prioridad",
+                "Estado", "Estado de resolucion", "Modulo", "Ambiente",
+            ]
+        
+        if self.SECTION_COLUMNS is None:
+            self.SECTION_COLUMNS = [
+                "ID del ticket", "Estado", "Estado de resolucion", "Prioridad", "Tipo",
+                "Grupo", "Team Asignado", "Ambiente", "Modulo", "Hora de creacion",
+                "Hora de resolucion", "Año", "Mes", "Periodo", "Año Resolucion",
+                "Mes Resolucion", "Periodo Resolucion", self.RESOLVED_FLAG_COLUMN,
+                self.ESTADO_GROUPED_COLUMN,
+            ]
+        
         if self.MONTH_NAMES_ES is None:
             self.MONTH_NAMES_ES = {
                 1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril", 5: "Mayo", 6: "Junio",
@@ -1,6 +1,7 @@
 """Renderers for distribution-oriented KPI sections."""
 from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -8,6 +9,7 @@ from utils import (
     build_priority_category_order,
     map_priority_sort,
     normalize_priority_labels,
+    stack_year_tables,
 )
 
 from .presentation_helpers import (
@@ -15,7 +17,8 @@ from .presentation_helpers import (
     info_no_top_modules_year,
     warning_no_data_section,
 )
-from .section_renderer_base import SectionRendererBase
+from .pivot_cache import PIVOT_SOURCE_COLUMNS
+from .section_renderer_base import CHART_SOURCE_COLUMNS, SectionRendererBase
 
 
 class DistributionSectionsRenderer(SectionRendererBase):
@@ -27,59 +30,41 @@ class DistributionSectionsRenderer(SectionRendererBase):
         st.subheader("KPI - Flujo de tickets")
         current_year, years = self._year_window(selected_year)
 
+        month_order = list(range(1, 13))
+        created_window = self.filter.window_slice(base_filtered, years, prod_only=True)
+        created_window = created_window.dropna(subset=["Hora de creacion"])
+        created_by_year = self._count_tickets_by_year_month(
+            created_window, created_window["Año"], created_window["Mes"]
+        )
+
+        resolved_window = self.filter.resolved_window_slice(base_filtered, years, prod_only=True)
+        resolved_window = resolved_window[self._build_resolved_mask(resolved_window)]
+        resolved_by_year = self._count_tickets_by_year_month(
+            resolved_window, resolved_window["Año Resolucion"], resolved_window["Mes Resolucion"]
+        )
+
         tables = []
         for year in years:
-            created_base = self.filter.filter_by_year(base_filtered, year)
-            created_prod = self.filter.filter_production_environment(created_base)
-            created_prod = created_prod.dropna(subset=["Hora de creacion"])
-            month_order = list(range(1, 13))
-            if created_prod.empty:
-                created_counts = pd.Series(0, index=month_order)
-            else:
-                created_counts = (
-                    created_prod.groupby(created_prod["Hora de creacion"].dt.month)["ID del ticket"]
-                    .nunique()
-                    .reindex(month_order, fill_value=0)
-                )
-
-            resolved_base = self.filter.filter_resolved_by_year(base_filtered, year)
-            resolved_prod = self.filter.filter_production_environment(resolved_base)
-            resolved_mask = self._build_resolved_mask(resolved_prod)
-            if resolved_prod.empty:
-                resolved_counts = pd.Series(0, index=month_order)
-            else:
-                resolved_counts = (
-                    resolved_prod[resolved_mask]
-                    .groupby(pd.to_datetime(resolved_prod["Hora de resolucion"], errors="coerce").dt.month)[
-                        "ID del ticket"
-                    ]
-                    .nunique()
-                    .reindex(month_order, fill_value=0)
-                )
+            created_counts = self._year_counts(created_by_year, year, month_order)
+            resolved_counts = self._year_counts(resolved_by_year, year, month_order)
 
             if created_counts.sum() == 0 and resolved_counts.sum() == 0:
                 info_no_data_year(year)
                 continue
 
             table = self.table_builder.build_monthly_counts_table(created_counts, resolved_counts)
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in table.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            tables.extend([year_row, table])
+            tables.append((year, table))
 
         if not tables:
             warning_no_data_section("Flujo de tickets")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Tickets"
+        combined_table = stack_year_tables(tables, "Tickets")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "Flujo de tickets")
 
         chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered[base_filtered["Año"].isin(chart_years)].copy()
-        chart_df = self.filter.filter_production_environment(chart_df)
+        chart_df = self.filter.window_slice(base_filtered, chart_years, prod_only=True)
         if not chart_df.empty:
             today = pd.Timestamp.today()
             all_months = []
@@ -94,24 +79,12 @@ class DistributionSectionsRenderer(SectionRendererBase):
                 )
             all_months = pd.to_datetime(all_months)
 
-            created_base = chart_df.dropna(subset=["Hora de creacion"]).copy()
-            created_base["Periodo"] = (
-                created_base["Hora de creacion"].dt.to_period("M").dt.to_timestamp()
-            )
-            created_counts = (
-                created_base.groupby("Periodo")["ID del ticket"].nunique()
-                .reindex(all_months, fill_value=0)
-            )
+            created_counts = self._period_counts(created_by_year, all_months)
 
             resolved_mask = self._build_resolved_mask(chart_df)
-            resolved_base = chart_df[resolved_mask].copy()
-            resolved_base["Periodo"] = (
-                pd.to_datetime(resolved_base["Hora de resolucion"], errors="coerce")
-                .dt.to_period("M")
-                .dt.to_timestamp()
-            )
+            resolved_base = chart_df[resolved_mask]
             resolved_counts = (
-                resolved_base.groupby("Periodo")["ID del ticket"].nunique()
+                resolved_base.groupby("Periodo Resolucion", observed=True)["ID del ticket"].nunique()
                 .reindex(all_months, fill_value=0)
             )
 
@@ -121,7 +94,7 @@ class DistributionSectionsRenderer(SectionRendererBase):
                         {
                             "Periodo": all_months,
                             "Tipo": "Creados",
-                            "Tickets": created_counts.values,
+                            "Tickets": created_counts,
                         }
                     ),
                     pd.DataFrame(
@@ -142,6 +115,43 @@ class DistributionSectionsRenderer(SectionRendererBase):
 
         return display_table
 
+    @staticmethod
+    def _count_tickets_by_year_month(
+        df: pd.DataFrame, year_values: pd.Series, month_values: pd.Series
+    ) -> pd.DataFrame:
+        """Count unique tickets per month (rows) and year (columns) with a single bincount."""
+        if df.empty:
+            return pd.DataFrame()
+        ticket_codes, _ = pd.factorize(df["ID del ticket"])
+        year_codes, year_labels = pd.factorize(year_values, sort=True)
+        months = pd.to_numeric(month_values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        valid = (ticket_codes >= 0) & (year_codes >= 0) & (months >= 1) & (months <= 12)
+        if not valid.any():
+            return pd.DataFrame()
+        year_months = year_codes[valid] * 13 + months[valid].astype(np.int64)
+        unique_pairs = np.unique(np.stack([ticket_codes[valid], year_months]), axis=1)
+        counts = np.bincount(unique_pairs[1], minlength=len(year_labels) * 13)
+        return pd.DataFrame(
+            counts.reshape(len(year_labels), 13)[:, 1:].T,
+            index=pd.Index(range(1, 13), name="month"),
+            columns=pd.Index(year_labels, name="year"),
+        )
+
+    @staticmethod
+    def _period_counts(counts_by_year: pd.DataFrame, periods: pd.DatetimeIndex) -> np.ndarray:
+        """Read month-start periods out of the month x year counts table, zero-filling gaps."""
+        if counts_by_year.empty:
+            return np.zeros(len(periods), dtype=int)
+        period_keys = pd.MultiIndex.from_arrays([periods.year, periods.month])
+        return counts_by_year.unstack().reindex(period_keys, fill_value=0).to_numpy()
+
+    @staticmethod
+    def _year_counts(counts_by_year: pd.DataFrame, year: int, month_order: List[int]) -> pd.Series:
+        """Return one year's monthly counts, zero-filled for missing months or years."""
+        if year not in counts_by_year.columns:
+            return pd.Series(0, index=month_order)
+        return counts_by_year[year].reindex(month_order, fill_value=0)
+
     def render_team_section(
         self,
         base_filtered: pd.DataFrame,
@@ -155,35 +165,25 @@ class DistributionSectionsRenderer(SectionRendererBase):
 
         tables = []
         for year in years:
-            year_df = self.filter.filter_by_year(base_filtered, year)
-            if prod_only:
-                year_df = self.filter.filter_production_environment(year_df)
+            year_df = self.filter.year_slice(base_filtered, year, prod_only)
             if year_df.empty:
                 info_no_data_year(year)
                 continue
-            pivot = self.table_builder.build_pivot_table(
+            pivot = self._build_pivot(
                 year_df, "Team Asignado", "Sin team asignado"
             )
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - Team Asignado")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Team Asignado"
+        combined_table = stack_year_tables(tables, "Team Asignado")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "Team Asignado")
 
         chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered[base_filtered["Año"].isin(chart_years)].copy()
-        if prod_only:
-            chart_df = self.filter.filter_production_environment(chart_df)
+        chart_df = self.filter.window_slice(base_filtered, chart_years, prod_only)
         if not chart_df.empty:
             team_fig = self.chart_renderer.render_trend_chart(
                 chart_df,
@@ -209,13 +209,11 @@ class DistributionSectionsRenderer(SectionRendererBase):
 
         tables = []
         for year in years:
-            year_df = self.filter.filter_by_year(base_filtered, year)
-            if prod_only:
-                year_df = self.filter.filter_production_environment(year_df)
+            year_df = self.filter.year_slice(base_filtered, year, prod_only)
             if year_df.empty:
                 info_no_data_year(year)
                 continue
-            pivot = self.table_builder.build_pivot_table(
+            pivot = self._build_pivot(
                 year_df,
                 "Grupo",
                 "Sin cliente",
@@ -228,26 +226,18 @@ class DistributionSectionsRenderer(SectionRendererBase):
             else:
                 pivot = pivot.sort_values(by="Total", ascending=False)
 
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - Cliente")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Cliente"
+        combined_table = stack_year_tables(tables, "Cliente")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "KPI - Cliente")
 
         chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered[base_filtered["Año"].isin(chart_years)].copy()
-        if prod_only:
-            chart_df = self.filter.filter_production_environment(chart_df)
+        chart_df = self.filter.window_slice(base_filtered, chart_years, prod_only)
         if not chart_df.empty:
             cliente_fig = self.chart_renderer.render_trend_chart(
                 chart_df,
@@ -273,17 +263,16 @@ class DistributionSectionsRenderer(SectionRendererBase):
 
         tables = []
         for year in years:
-            year_df = self.filter.filter_by_year(base_filtered, year)
-            if prod_only:
-                year_df = self.filter.filter_production_environment(year_df)
+            year_df = self.filter.year_slice(base_filtered, year, prod_only)
             if year_df.empty:
                 info_no_data_year(year)
                 continue
 
-            year_df = year_df.copy()
-            year_df["Prioridad"] = normalize_priority_labels(year_df["Prioridad"])
+            year_df = self._relabel(
+                year_df, PIVOT_SOURCE_COLUMNS, Prioridad=normalize_priority_labels(year_df["Prioridad"])
+            )
 
-            pivot = self.table_builder.build_pivot_table(
+            pivot = self._build_pivot(
                 year_df, "Prioridad", "Sin criticidad"
             )
             if "Total" in pivot.index:
@@ -294,36 +283,28 @@ class DistributionSectionsRenderer(SectionRendererBase):
                 pivot_body = pivot
 
             priority_labels = pivot_body.index.to_series().astype(str)
-            priority_sort = map_priority_sort(priority_labels)
-            tie_breaker = priority_labels.str.strip().str.lower()
-            pivot_body = pivot_body.assign(_prio_sort=priority_sort.values, _prio_tie=tie_breaker.values)
-            pivot_body = pivot_body.sort_values(by=["_prio_sort", "_prio_tie"]).drop(columns=["_prio_sort", "_prio_tie"])
+            priority_sort = map_priority_sort(priority_labels).to_numpy()
+            tie_codes, _ = pd.factorize(priority_labels.str.strip().str.lower(), sort=True)
+            pivot_body = pivot_body.iloc[np.lexsort((tie_codes, priority_sort))]
 
             pivot = pd.concat([pivot_body, total_row]) if total_row is not None else pivot_body
 
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - Criticidad")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Prioridad"
+        combined_table = stack_year_tables(tables, "Prioridad")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "Criticidad")
 
         chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered[base_filtered["Año"].isin(chart_years)].copy()
-        if prod_only:
-            chart_df = self.filter.filter_production_environment(chart_df)
+        chart_df = self.filter.window_slice(base_filtered, chart_years, prod_only)
         if not chart_df.empty:
-            chart_df = chart_df.copy()
-            chart_df["Prioridad"] = normalize_priority_labels(chart_df["Prioridad"])
+            chart_df = self._relabel(
+                chart_df, CHART_SOURCE_COLUMNS, Prioridad=normalize_priority_labels(chart_df["Prioridad"])
+            )
             chart_priority_order = build_priority_category_order(chart_df["Prioridad"])
             criticidad_fig = self.chart_renderer.render_trend_chart(
                 chart_df,
@@ -354,16 +335,17 @@ class DistributionSectionsRenderer(SectionRendererBase):
             help="Por defecto se muestra TOP 5 por total de casos.",
         )
 
-        ranking_df = base_filtered[base_filtered["Año"].isin(years)].copy()
-        if prod_only:
-            ranking_df = self.filter.filter_production_environment(ranking_df)
+        ranking_df = self.filter.window_slice(base_filtered, years, prod_only)
 
         top_modules: Optional[List[str]] = None
         if not show_all_modules and not ranking_df.empty:
-            ranking_df = ranking_df.copy()
-            ranking_df["Modulo"] = ranking_df["Modulo"].fillna("Sin módulo")
+            ranking_df = self._relabel(
+                ranking_df,
+                ["ID del ticket"],
+                Modulo=self.table_builder.fill_missing_labels(ranking_df["Modulo"], "Sin módulo"),
+            )
             top_modules = (
-                ranking_df.groupby("Modulo")["ID del ticket"]
+                ranking_df.groupby("Modulo", observed=True)["ID del ticket"]
                 .nunique()
                 .sort_values(ascending=False)
                 .head(5)
@@ -374,13 +356,11 @@ class DistributionSectionsRenderer(SectionRendererBase):
 
         tables = []
         for year in years:
-            year_df = self.filter.filter_by_year(base_filtered, year)
-            if prod_only:
-                year_df = self.filter.filter_production_environment(year_df)
+            year_df = self.filter.year_slice(base_filtered, year, prod_only)
             if year_df.empty:
                 info_no_data_year(year)
                 continue
-            pivot = self.table_builder.build_pivot_table(year_df, "Modulo", "Sin módulo")
+            pivot = self._build_pivot(year_df, "Modulo", "Sin módulo")
 
             if top_modules:
                 available_modules = [module for module in top_modules if module in pivot.index]
@@ -395,29 +375,24 @@ class DistributionSectionsRenderer(SectionRendererBase):
                 pivot = pd.concat([pivot, total_row])
             else:
                 pivot = pivot.sort_values(by="Total", ascending=False)
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - Módulo")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Modulo"
+        combined_table = stack_year_tables(tables, "Modulo")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "Módulo")
 
         if not show_all_modules:
-            chart_df = base_filtered[base_filtered["Año"].isin(years)].copy()
-            if prod_only:
-                chart_df = self.filter.filter_production_environment(chart_df)
+            chart_df = self.filter.window_slice(base_filtered, years, prod_only)
             if top_modules:
-                chart_df = chart_df.copy()
-                chart_df["Modulo"] = chart_df["Modulo"].fillna("Sin módulo")
+                chart_df = self._relabel(
+                    chart_df,
+                    CHART_SOURCE_COLUMNS,
+                    Modulo=self.table_builder.fill_missing_labels(chart_df["Modulo"], "Sin módulo"),
+                )
                 chart_df = chart_df[chart_df["Modulo"].isin(top_modules)]
 
             if not chart_df.empty:
@@ -444,31 +419,25 @@ class DistributionSectionsRenderer(SectionRendererBase):
 
         tables = []
         for year in years:
-            year_df = self.filter.filter_by_year(base_filtered, year)
+            year_df = self.filter.year_slice(base_filtered, year, prod_only=False)
             if year_df.empty:
                 info_no_data_year(year)
                 continue
-            pivot = self.table_builder.build_pivot_table(
+            pivot = self._build_pivot(
                 year_df, "Ambiente", "Sin ambiente"
             )
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - Ambiente")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Ambiente"
+        combined_table = stack_year_tables(tables, "Ambiente")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "Ambiente")
 
         chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered[base_filtered["Año"].isin(chart_years)].copy()
+        chart_df = self.filter.window_slice(base_filtered, chart_years, prod_only=False)
         if not chart_df.empty:
             ambiente_fig = self.chart_renderer.render_trend_chart(
                 chart_df,
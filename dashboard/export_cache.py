@@ -1,6 +1,7 @@
 """Cache layer for export artifacts."""
 from __future__ import annotations
 
+import concurrent.futures
 from typing import Any, List, Optional, Tuple
 
 import pandas as pd
@@ -9,6 +10,12 @@ import streamlit as st
 from services import ExportBuilder
 
 
+@st.cache_resource(show_spinner=False)
+def get_export_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the process-wide executor that builds export files off the script thread."""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+
+
 @st.cache_data(show_spinner=False, ttl=3600, max_entries=128)
 def build_excel_bytes_cached(
     signature: str,
@@ -0,0 +1,71 @@
+"""Cache layer for dashboard filter options."""
+from __future__ import annotations
+
+import weakref
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from data import DataFilter
+from utils import TeamFilterHelper
+
+FILTER_OPTION_COLUMNS = ["Año", "Grupo", "Team Asignado", "Prioridad"]
+
+FilterOptions = Tuple[List[int], List[str], List[str], Dict[str, List[str]], List[str]]
+
+_options_by_frame: Dict[int, Dict[bool, FilterOptions]] = {}
+
+
+def select_filter_option_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Project the columns that drive filter options (keeps cache hashing cheap)."""
+    return df[[col for col in FILTER_OPTION_COLUMNS if col in df.columns]]
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_filter_options_cached(
+    options_source: pd.DataFrame,
+    commercial_mode: bool,
+    _data_filter: DataFilter,
+    _team_filter_helper: TeamFilterHelper,
+) -> FilterOptions:
+    """Build/cached year, client, team and criticidad options for the filter bar."""
+    year_options = (
+        sorted(options_source["Año"].dropna().unique(), reverse=True)
+        if "Año" in options_source.columns
+        else []
+    )
+    client_options = (
+        sorted(options_source["Grupo"].dropna().unique())
+        if "Grupo" in options_source.columns
+        else []
+    )
+    team_options, team_option_map = _team_filter_helper.build_team_filter_config(
+        options_source,
+        commercial_mode,
+    )
+    criticidad_options = _data_filter.get_criticidad_options(options_source)
+    return year_options, client_options, team_options, team_option_map, criticidad_options
+
+
+def get_filter_options(
+    df: pd.DataFrame,
+    commercial_mode: bool,
+    data_filter: DataFilter,
+    team_filter_helper: TeamFilterHelper,
+) -> FilterOptions:
+    """Return filter options memoized on the live frame, skipping the content hash on reruns."""
+    df_id = id(df)
+    frame_options = _options_by_frame.get(df_id)
+    if frame_options is None:
+        frame_options = {}
+        weakref.finalize(df, _options_by_frame.pop, df_id, None)
+        _options_by_frame[df_id] = frame_options
+    if commercial_mode not in frame_options:
+        frame_options[commercial_mode] = build_filter_options_cached(
+            select_filter_option_columns(df),
+            commercial_mode,
+            _data_filter=data_filter,
+            _team_filter_helper=team_filter_helper,
+        )
+    return frame_options[commercial_mode]
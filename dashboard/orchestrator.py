@@ -1,24 +1,47 @@
 """Dashboard orchestration and coordination."""
-from typing import List, Optional, Tuple
+from functools import lru_cache, partial
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 
 from config import AppConfig
 from data import DataFilter
 from services import ExportBuilder, ExportStateManager, TableBuilder
 from ui import ChartRenderer
-from utils import TeamFilterHelper, TicketStatusHelper
+from utils import TeamFilterHelper, TicketStatusHelper, style_numeric_display_table
 
 from .sections_renderer import SectionsRenderer
-from .export_cache import build_excel_bytes_cached, build_pdf_bytes_cached
+from .export_cache import build_excel_bytes_cached, build_pdf_bytes_cached, get_export_executor
+from .filter_options_cache import get_filter_options
+from .section_specs import DASHBOARD_SECTION_GROUPS, SectionGroup
 from .usage_renderer import UsageRenderer
 
 
+@lru_cache(maxsize=512)
+def _normalize_key(prefix: str, parts: Tuple[str, ...]) -> str:
+    """Join normalized key parts under the dashboard prefix."""
+    normalized_parts = [
+        str(part).strip().lower().replace(" ", "_").replace("-", "_")
+        for part in parts
+        if str(part).strip()
+    ]
+    if not normalized_parts:
+        return prefix
+    return "_".join([prefix, *normalized_parts])
+
+
 class DashboardOrchestrator:
     """Orquesta el flujo principal del dashboard y delega responsabilidades."""
 
     SUPPORT_TEAM_UNIFIED_LABEL = "Soporte"
+    SECTION_GROUPS = DASHBOARD_SECTION_GROUPS
+    EXPORT_POLL_SECONDS = 0.5
+
+    _group_base_cache: Dict[int, Dict[Tuple[str, str], Tuple[Optional[bytes], pd.DataFrame]]] = {}
 
     def __init__(self, config: AppConfig):
         self.config = config
@@ -41,18 +64,11 @@ class DashboardOrchestrator:
     def _render_table_in_details_expander(table: pd.DataFrame, section_label: str) -> None:
         """Render a table inside a details expander."""
         with st.expander(f"Ver detalles - {section_label}", expanded=False):
-            st.table(table)
+            st.table(style_numeric_display_table(table))
 
     def _build_widget_key(self, *parts: str) -> str:
         """Build a stable and unique Streamlit key for the active dashboard context."""
-        normalized_parts = [
-            str(part).strip().lower().replace(" ", "_").replace("-", "_")
-            for part in parts
-            if str(part).strip()
-        ]
-        if not normalized_parts:
-            return self._widget_prefix
-        return "_".join([self._widget_prefix, *normalized_parts])
+        return _normalize_key(self._widget_prefix, parts)
 
 
     def render_dashboard(
@@ -65,8 +81,9 @@ class DashboardOrchestrator:
         """Render dashboard according to selected dashboard type."""
         self._export_charts: List[Tuple[str, object]] = []
         self._widget_prefix = widget_prefix
-        is_commercial_dashboard = str(widget_prefix).strip().lower() == "comercial"
-        is_support_dashboard = str(widget_prefix).strip().lower() == "soporte"
+        normalized_prefix = str(widget_prefix).strip().lower()
+        self._is_commercial = is_commercial_dashboard = normalized_prefix == "comercial"
+        self._is_support = is_support_dashboard = normalized_prefix == "soporte"
 
         self.sections_renderer.set_runtime(
             build_widget_key=self._build_widget_key,
@@ -97,202 +114,44 @@ class DashboardOrchestrator:
             export_charts=self._export_charts,
         )
         if usage_table is not None:
-            export_tables.append(("Usabilidad - Actividad", usage_table))
+            self._add_export_tables(export_tables, [("Usabilidad - Actividad", usage_table)])
 
-        base_filtered = self.filter.filter_by_client(df, selected_client)
-        base_filtered = self.filter.filter_by_team(base_filtered, selected_team_values)
-        base_filtered = self.filter.filter_by_criticidad(base_filtered, selected_criticidad)
-        base_filtered = self.filter.filter_by_types(
-            base_filtered, ["Consulta de informacion", "Incidencia"]
+        selection_positions = self.filter.positions_by_criteria(
+            df,
+            client=selected_client,
+            team=selected_team_values,
+            criticidades=selected_criticidad,
         )
-
-        st.header("KPIs - Consulta de Informacion e Incidencias")
-        st.subheader("Análisis de tickets en ambientes productivos")
-
-        if base_filtered.empty:
-            st.warning("No hay datos para Consulta de Informacion e Incidencias con los filtros seleccionados.")
+        section_context = {
+            "commercial_mode": is_commercial_dashboard,
+            "show_unresolved_ticket_ids": is_support_dashboard,
+        }
+        if selection_positions is not None and selection_positions.size == 0:
+            st.warning("No hay tickets para los filtros seleccionados.")
+            visible_groups = []
         else:
-            incidents_table = self.sections_renderer.render_incidents_table(base_filtered, selected_year)
-            if incidents_table is not None:
-                export_tables.append(("Consulta e Incidencias - Flujo", incidents_table))
-
-            cliente_incidencias = self.sections_renderer.render_cliente_mensual_section(
-                base_filtered,
-                selected_year,
-                prod_only=True,
-                export_chart_label="Consulta e Incidencias - Clientes",
-                chart_key_suffix="incidencias_cliente_mensual",
-            )
-            if cliente_incidencias is not None:
-                export_tables.append(("Consulta e Incidencias - Clientes", cliente_incidencias))
-
-            if not is_commercial_dashboard:
-                team_table = self.sections_renderer.render_team_section(
-                    base_filtered,
+            visible_groups = [
+                group
+                for group in self.SECTION_GROUPS
+                if not (group.hide_in_commercial and is_commercial_dashboard)
+            ]
+        for group in visible_groups:
+            group_base = self._prepare_group_base(df, group, selection_positions)
+            self._add_export_tables(
+                export_tables,
+                self._render_section_group(
+                    group,
+                    group_base,
                     selected_year,
-                    prod_only=True,
-                    export_chart_label="Consulta e Incidencias - Team",
-                    chart_key_suffix="incidencias_team",
+                    {**section_context, "prod_only": group.is_prod_only(is_commercial_dashboard)},
+                    is_commercial_dashboard=is_commercial_dashboard,
                 )
-                if team_table is not None:
-                    export_tables.append(("Consulta e Incidencias - Team", team_table))
-
-            criticidad_table = self.sections_renderer.render_criticidad_section(
-                base_filtered,
-                selected_year,
-                prod_only=True,
-                export_chart_label="Consulta e Incidencias - Criticidad",
-                chart_key_suffix="incidencias_criticidad",
-            )
-            if criticidad_table is not None:
-                export_tables.append(("Consulta e Incidencias - Criticidad", criticidad_table))
-
-            sla_table = self.sections_renderer.render_resolucion_section(base_filtered, selected_year)
-            if sla_table is not None:
-                export_tables.append(("Consulta e Incidencias - SLA", sla_table))
-
-            sla_criticidad_table = self.sections_renderer.render_sla_criticidad_section(
-                base_filtered,
-                selected_year,
-                export_chart_label="Consulta e Incidencias - SLA por Criticidad",
-                chart_key_suffix="incidencias_sla_criticidad",
-            )
-            if sla_criticidad_table is not None:
-                export_tables.append(("Consulta e Incidencias - SLA por Criticidad", sla_criticidad_table))
-
-            modulo_table = self.sections_renderer.render_modulo_section(
-                base_filtered,
-                selected_year,
-                prod_only=True,
-                export_chart_label="Consulta e Incidencias - Modulo",
-                chart_key_suffix="incidencias_modulo",
             )
-            if modulo_table is not None:
-                export_tables.append(("Consulta e Incidencias - Modulo", modulo_table))
-
-            if not is_commercial_dashboard:
-                ambiente_table = self.sections_renderer.render_ambiente_section(
-                    base_filtered,
-                    selected_year,
-                    export_chart_label="Consulta e Incidencias - Ambiente",
-                )
-                if ambiente_table is not None:
-                    export_tables.append(("Consulta e Incidencias - Ambiente", ambiente_table))
-
-            estado_table = self.sections_renderer.render_estado_section(
-                base_filtered,
-                selected_year,
-                prod_only=True,
-                export_chart_label="Consulta e Incidencias - Estado",
-                chart_key_suffix="incidencias_estado",
-                commercial_mode=is_commercial_dashboard,
-                show_unresolved_ticket_ids=is_support_dashboard,
-            )
-            if estado_table is not None:
-                export_tables.append(("Consulta e Incidencias - Estado", estado_table))
-
-        cambio_base = self.filter.filter_by_client(df, selected_client)
-        cambio_base = self.filter.filter_by_team(cambio_base, selected_team_values)
-        cambio_base = self.filter.filter_by_criticidad(cambio_base, selected_criticidad)
-        cambio_base = self.filter.filter_by_types(cambio_base, ["Cambio"])
-        cambios_prod_only = is_commercial_dashboard
-
-        st.header("KPIs - Solicitudes de Cambio")
-        if cambios_prod_only:
-            st.subheader("Análisis de tickets en ambientes productivos")
-        else:
-            st.subheader("Análisis de tickets de TODOS los ambientes")
-
-        if cambio_base.empty:
-            st.warning("No hay datos para Solicitudes de Cambio con los filtros seleccionados.")
-        else:
-            cliente_mensual_cambio = self.sections_renderer.render_cliente_mensual_section(
-                cambio_base,
-                selected_year,
-                prod_only=cambios_prod_only,
-                export_chart_label="Cambios - Clientes",
-                chart_key_suffix="cambios_cliente_mensual",
-            )
-            if cliente_mensual_cambio is not None:
-                export_tables.append(("Cambios - Clientes", cliente_mensual_cambio))
-
-            if not is_commercial_dashboard:
-                team_cambio = self.sections_renderer.render_team_section(
-                    cambio_base,
-                    selected_year,
-                    prod_only=cambios_prod_only,
-                    export_chart_label="Cambios - Team",
-                    chart_key_suffix="cambios_team",
-                )
-                if team_cambio is not None:
-                    export_tables.append(("Cambios - Team", team_cambio))
-
-            modulo_cambio = self.sections_renderer.render_modulo_section(
-                cambio_base,
-                selected_year,
-                prod_only=cambios_prod_only,
-                export_chart_label="Cambios - Modulo",
-                chart_key_suffix="cambios_modulo",
-            )
-            if modulo_cambio is not None:
-                export_tables.append(("Cambios - Modulo", modulo_cambio))
-
-            estado_cambio = self.sections_renderer.render_estado_section(
-                cambio_base,
-                selected_year,
-                prod_only=cambios_prod_only,
-                export_chart_label="Cambios - Estado",
-                chart_key_suffix="cambios_estado",
-                commercial_mode=False,
-            )
-            if estado_cambio is not None:
-                export_tables.append(("Cambios - Estado", estado_cambio))
-
-        if not is_commercial_dashboard:
-            internos_base = self.filter.filter_by_client(df, selected_client)
-            internos_base = self.filter.filter_by_team(internos_base, selected_team_values)
-            internos_base = self.filter.filter_by_criticidad(internos_base, selected_criticidad)
-            internos_base = self.filter.filter_by_types(internos_base, ["Interno"])
-
-            st.header("KPIs - Solicitudes de Mejoras Técnicas")
-            st.subheader("Análisis de tickets de TODOS los ambientes")
-
-            if internos_base.empty:
-                st.warning("No hay datos para Solicitudes de Mejoras Técnicas con los filtros seleccionados.")
-            else:
-                team_interno = self.sections_renderer.render_team_section(
-                    internos_base,
-                    selected_year,
-                    prod_only=False,
-                    export_chart_label="Internos - Team",
-                    chart_key_suffix="internos_team",
-                )
-                if team_interno is not None:
-                    export_tables.append(("Internos - Team", team_interno))
-
-                modulo_interno = self.sections_renderer.render_modulo_section(
-                    internos_base,
-                    selected_year,
-                    prod_only=False,
-                    export_chart_label="Internos - Modulo",
-                    chart_key_suffix="internos_modulo",
-                )
-                if modulo_interno is not None:
-                    export_tables.append(("Internos - Modulo", modulo_interno))
-
-                estado_interno = self.sections_renderer.render_estado_section(
-                    internos_base,
-                    selected_year,
-                    prod_only=False,
-                    export_chart_label="Internos - Estado",
-                    chart_key_suffix="internos_estado",
-                    commercial_mode=False,
-                )
-                if estado_interno is not None:
-                    export_tables.append(("Internos - Estado", estado_interno))
 
         self._render_export_section(
             export_tables,
+            export_charts=self._export_charts,
+            widget_prefix=widget_prefix,
             selected_year=selected_year,
             selected_client=selected_client,
             selected_team=selected_team_labels,
@@ -300,22 +159,89 @@ class DashboardOrchestrator:
             dashboard_name=dashboard_name,
         )
 
+    def _add_export_tables(
+        self,
+        export_tables: List[Tuple[str, pd.DataFrame]],
+        new_tables: List[Tuple[str, pd.DataFrame]],
+    ) -> None:
+        """Collect export tables; build_signatures hashes them once per live table."""
+        export_tables.extend(new_tables)
+
+    def _prepare_group_base(
+        self,
+        df: pd.DataFrame,
+        group: SectionGroup,
+        selection_positions: Optional[np.ndarray],
+    ) -> pd.DataFrame:
+        """Gather the rows/columns a KPI block renders from, memoized per selection."""
+        selection_signature = None if selection_positions is None else selection_positions.tobytes()
+        df_id = id(df)
+        frame_bases = DashboardOrchestrator._group_base_cache.get(df_id)
+        if frame_bases is None:
+            frame_bases = DashboardOrchestrator._group_base_cache.setdefault(df_id, {})
+            weakref.finalize(df, DashboardOrchestrator._group_base_cache.pop, df_id, None)
+        cached_base = frame_bases.get((self._widget_prefix, group.header))
+        if cached_base is not None and cached_base[0] == selection_signature:
+            return cached_base[1]
+
+        group_positions = self.filter.combine_positions(
+            selection_positions,
+            self.filter.positions_by_types(df, list(group.types)),
+        )
+        group_base = self.filter.select_positions(df, group_positions, self.config.SECTION_COLUMNS)
+        frame_bases[(self._widget_prefix, group.header)] = (selection_signature, group_base)
+        return group_base
+
+    def _render_section_group(
+        self,
+        group: SectionGroup,
+        group_base: pd.DataFrame,
+        selected_year: Optional[int],
+        context: Dict[str, Any],
+        is_commercial_dashboard: bool,
+    ) -> List[Tuple[str, pd.DataFrame]]:
+        """Render one KPI block from its declarative spec and return its export tables."""
+        st.header(group.header)
+        if context["prod_only"]:
+            st.subheader("Análisis de tickets en ambientes productivos")
+        else:
+            st.subheader("Análisis de tickets de TODOS los ambientes")
+
+        if group_base.empty:
+            st.warning(group.empty_warning)
+            return []
+
+        group_tables: List[Tuple[str, pd.DataFrame]] = []
+        for spec in group.sections:
+            if spec.hide_in_commercial and is_commercial_dashboard:
+                continue
+            render_section = getattr(self.sections_renderer, spec.method)
+            section_kwargs = {arg: context[arg] for arg in spec.context_args}
+            table = render_section(group_base, selected_year, **section_kwargs, **spec.kwargs)
+            if table is not None:
+                group_tables.append((spec.export_label, table))
+        return group_tables
+
     def _render_filters(self, df: pd.DataFrame, commercial_mode: bool = False) -> tuple:
         """Render filter controls and return selections."""
         st.caption("Ajusta los filtros y haz clic en 'Aplicar filtros' para actualizar el dashboard.")
         applied_signature_key = self._build_widget_key("filter", "applied_signature")
         applied_values_key = self._build_widget_key("filter", "applied_values")
+        (
+            year_options,
+            client_options,
+            team_options,
+            team_option_map,
+            criticidad_options,
+        ) = get_filter_options(df, commercial_mode, self.filter, self.team_filter_helper)
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            year_options = sorted(df["Año"].dropna().unique(), reverse=True)
             current_year = pd.Timestamp.today().year
             year_index = 0
             if year_options:
-                year_index = min(
-                    range(len(year_options)),
-                    key=lambda idx: abs(year_options[idx] - current_year),
-                )
+                year_values = np.fromiter(year_options, dtype=np.int64, count=len(year_options))
+                year_index = int(np.argmin(np.abs(year_values - current_year)))
             selected_year = (
                 st.selectbox(
                     "Año",
@@ -329,7 +255,6 @@ class DashboardOrchestrator:
             )
 
         with col2:
-            client_options = sorted(df["Grupo"].dropna().unique())
             selected_client = (
                 st.multiselect(
                     "Cliente (Grupo)",
@@ -342,7 +267,6 @@ class DashboardOrchestrator:
             )
 
         with col3:
-            team_options, team_option_map = self.team_filter_helper.build_team_filter_config(df, commercial_mode)
             selected_team_labels = (
                 st.multiselect(
                     "Team Asignado",
@@ -355,7 +279,6 @@ class DashboardOrchestrator:
             )
 
         with col4:
-            criticidad_options = self.filter.get_criticidad_options(df)
             selected_criticidad = (
                 st.multiselect(
                     "Criticidad",
@@ -409,19 +332,25 @@ class DashboardOrchestrator:
 
         return applied_year, applied_client, applied_team_labels, applied_team_values, applied_criticidad
 
+    @st.fragment
     def _render_export_section(
         self,
         export_tables: List[Tuple[str, pd.DataFrame]],
+        export_charts: List[Tuple[str, object]],
+        widget_prefix: str,
         selected_year: Optional[int],
         selected_client: List[str],
         selected_team: List[str],
         selected_criticidad: List[str],
         dashboard_name: str,
     ) -> None:
-        """Render export buttons for currently displayed tables."""
+        """Render export buttons as a fragment so export interactions skip the KPI sections."""
         if not export_tables:
             return
 
+        def export_key(*parts: str) -> str:
+            return _normalize_key(widget_prefix, parts)
+
         st.header("Exportación")
         labels = self.export_state_manager.build_filter_labels(
             selected_year=selected_year,
@@ -431,8 +360,9 @@ class DashboardOrchestrator:
         )
         year_label = labels["year"]
         filters_text = self.export_state_manager.build_filters_text(dashboard_name, labels)
+        pdf_title = f"Informes Gerenciales de Tickets - {dashboard_name}"
 
-        cache = st.session_state.setdefault(self._build_widget_key("export", "cache"), {})
+        cache = st.session_state.setdefault(export_key("export", "cache"), {})
         self.export_state_manager.ensure_cache(cache)
         is_busy = bool(cache.get("busy"))
 
@@ -441,9 +371,9 @@ class DashboardOrchestrator:
             value=True,
             help="Activado: incluye gráficos (consume más memoria, especialmente en PDF). Desactivado: solo tablas (más estable y rápido).",
             disabled=is_busy,
-            key=self._build_widget_key("export", "include_charts"),
+            key=export_key("export", "include_charts"),
         )
-        chart_payload = self._export_charts if include_charts else None
+        chart_payload = export_charts if include_charts else None
 
         excel_signature, pdf_signature = self.export_state_manager.build_signatures(
             export_tables=export_tables,
@@ -473,20 +403,20 @@ class DashboardOrchestrator:
                     "Preparar Excel",
                     use_container_width=True,
                     disabled=is_busy,
-                    key=self._build_widget_key("export", "prepare_excel"),
+                    key=export_key("export", "prepare_excel"),
                 ):
                     cache["busy"] = True
                     cache["pending_action"] = "excel"
-                    st.rerun()
+                    self._rerun_export_fragment()
             else:
                 st.download_button(
                     "Descargar Excel",
-                    data=cache["excel_bytes"],
+                    data=partial(build_excel_bytes_cached, excel_signature, export_tables, chart_payload),
                     file_name=f"{filename_base}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     use_container_width=True,
                     disabled=is_busy,
-                    key=self._build_widget_key("export", "download_excel"),
+                    key=export_key("export", "download_excel"),
                 )
 
         with col2:
@@ -496,44 +426,85 @@ class DashboardOrchestrator:
                     "Preparar PDF",
                     use_container_width=True,
                     disabled=is_busy,
-                    key=self._build_widget_key("export", "prepare_pdf"),
+                    key=export_key("export", "prepare_pdf"),
                 ):
                     cache["busy"] = True
                     cache["pending_action"] = "pdf"
-                    st.rerun()
+                    self._rerun_export_fragment()
             else:
                 st.download_button(
                     "Descargar PDF",
-                    data=cache["pdf_bytes"],
+                    data=partial(
+                        build_pdf_bytes_cached,
+                        pdf_signature,
+                        title=pdf_title,
+                        filters_text=filters_text,
+                        _tables=export_tables,
+                        _charts=chart_payload,
+                    ),
                     file_name=f"{filename_base}.pdf",
                     mime="application/pdf",
                     use_container_width=True,
                     disabled=is_busy,
-                    key=self._build_widget_key("export", "download_pdf"),
+                    key=export_key("export", "download_pdf"),
                 )
 
         pending_action = cache.get("pending_action")
         if cache.get("busy") and pending_action in {"excel", "pdf"}:
-            try:
+            action_signature = excel_signature if pending_action == "excel" else pdf_signature
+            future = cache.get("future")
+            if future is None:
+                executor = get_export_executor()
                 if pending_action == "excel":
-                    with st.spinner("Generando archivo Excel..."):
-                        cache["excel_bytes"] = build_excel_bytes_cached(
-                            excel_signature,
-                            export_tables,
-                            chart_payload,
-                        )
+                    future = executor.submit(
+                        build_excel_bytes_cached,
+                        excel_signature,
+                        export_tables,
+                        chart_payload,
+                    )
                 else:
-                    with st.spinner("Generando archivo PDF..."):
-                        cache["pdf_bytes"] = build_pdf_bytes_cached(
-                            pdf_signature,
-                            title=f"Informes Gerenciales de Tickets - {dashboard_name}",
-                            filters_text=filters_text,
-                            _tables=export_tables,
-                            _charts=chart_payload,
-                        )
-            except ImportError:
-                st.info("Para exportar PDF instala dependencias con: pip install -r requirements.txt")
-            finally:
-                cache["busy"] = False
-                cache["pending_action"] = None
+                    future = executor.submit(
+                        build_pdf_bytes_cached,
+                        pdf_signature,
+                        title=pdf_title,
+                        filters_text=filters_text,
+                        _tables=export_tables,
+                        _charts=chart_payload,
+                    )
+                cache["future"] = future
+                cache["future_signature"] = action_signature
+
+            self._poll_export_future(cache)
+
+    @st.fragment(run_every=EXPORT_POLL_SECONDS)
+    def _poll_export_future(self, cache: Dict[str, Any]) -> None:
+        """Poll the running export on a timer; only this fragment reruns until the build finishes."""
+        future = cache.get("future")
+        pending_action = cache.get("pending_action")
+        if future is None or pending_action not in {"excel", "pdf"}:
+            return
+        if not future.done():
+            st.info("Generando archivo Excel..." if pending_action == "excel" else "Generando archivo PDF...")
+            return
+
+        try:
+            future.result()
+            if cache.get("future_signature") == cache.get(f"{pending_action}_signature"):
+                cache[f"{pending_action}_ready"] = True
+        except ImportError:
+            st.info("Para exportar PDF instala dependencias con: pip install -r requirements.txt")
+        finally:
+            cache["busy"] = False
+            cache["pending_action"] = None
+            cache["future"] = None
+            cache["future_signature"] = None
+        # The download buttons live in the parent export fragment, so redraw the page once.
+        st.rerun()
+
+    @staticmethod
+    def _rerun_export_fragment() -> None:
+        """Rerun only the export fragment, or the whole app when not inside a fragment rerun."""
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
             st.rerun()
@@ -0,0 +1,25 @@
+"""Cache layer for KPI pivot tables."""
+from __future__ import annotations
+
+import pandas as pd
+import streamlit as st
+
+from services import TableBuilder
+
+PIVOT_SOURCE_COLUMNS = ["Mes", "ID del ticket"]
+
+
+def select_pivot_columns(df: pd.DataFrame, index_col: str) -> pd.DataFrame:
+    """Project the columns a monthly pivot reads (keeps cache hashing cheap)."""
+    return df[[index_col, *PIVOT_SOURCE_COLUMNS]]
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_pivot_table_cached(
+    pivot_source: pd.DataFrame,
+    index_col: str,
+    fill_missing: str,
+    _table_builder: TableBuilder,
+) -> pd.DataFrame:
+    """Build/cached monthly pivot keyed on the projected slice content."""
+    return _table_builder.build_pivot_table(pivot_source, index_col, fill_missing)
@@ -7,7 +7,11 @@ from config import AppConfig
 from data import DataFilter
 from services import TableBuilder
 from ui import ChartRenderer
-from utils import format_numeric_display_table, resolve_comparison_years
+from utils import coerce_numeric_table, resolve_comparison_years
+
+from .pivot_cache import build_pivot_table_cached, select_pivot_columns
+
+CHART_SOURCE_COLUMNS = ["Periodo", "ID del ticket"]
 
 
 class SectionRendererBase:
@@ -52,18 +56,26 @@ class SectionRendererBase:
         return resolve_comparison_years(selected_year)
 
     @staticmethod
-    def _format_table(
-        table: pd.DataFrame,
-        *,
-        coerce_numeric: bool = True,
-        replace_comma_with_dot: bool = True,
+    def _format_table(table: pd.DataFrame, *, coerce_numeric: bool = True) -> pd.DataFrame:
+        """Keep the combined table numeric; number formatting happens at render/export time."""
+        return coerce_numeric_table(table) if coerce_numeric else table
+
+    def _build_pivot(
+        self, df: pd.DataFrame, index_col: str, fill_missing: str = "Sin valor"
     ) -> pd.DataFrame:
-        return format_numeric_display_table(
-            table,
-            coerce_numeric=coerce_numeric,
-            replace_comma_with_dot=replace_comma_with_dot,
+        """Build a monthly pivot through the cache so unchanged slices skip the groupby on reruns."""
+        return build_pivot_table_cached(
+            select_pivot_columns(df, index_col),
+            index_col,
+            fill_missing,
+            self.table_builder,
         )
 
+    @staticmethod
+    def _relabel(df: pd.DataFrame, source_columns: List[str], **labels: pd.Series) -> pd.DataFrame:
+        """Attach relabeled columns to a narrow projection instead of copying the whole slice."""
+        return df[source_columns].assign(**labels)
+
     def _append_export_chart(self, label: str, chart_fig: object) -> None:
         if chart_fig is not None:
             self._export_charts.append((label, chart_fig))
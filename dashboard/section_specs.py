@@ -0,0 +1,190 @@
+"""Declarative layout of the KPI sections rendered by each dashboard."""
+from typing import Any, Dict, NamedTuple, Tuple
+
+PROD_SCOPE_ALWAYS = "always"
+PROD_SCOPE_COMMERCIAL = "commercial"
+PROD_SCOPE_NEVER = "never"
+
+
+class SectionSpec(NamedTuple):
+    """KPI section rendered through SectionsRenderer and exported under a label."""
+
+    export_label: str
+    method: str
+    kwargs: Dict[str, Any]
+    context_args: Tuple[str, ...] = ()
+    hide_in_commercial: bool = False
+
+
+class SectionGroup(NamedTuple):
+    """Block of KPI sections sharing ticket types and environment scope."""
+
+    header: str
+    types: Tuple[str, ...]
+    prod_scope: str
+    empty_warning: str
+    sections: Tuple[SectionSpec, ...]
+    hide_in_commercial: bool = False
+
+    def is_prod_only(self, commercial_mode: bool) -> bool:
+        """Return True when the group analyzes productive environments only."""
+        if self.prod_scope == PROD_SCOPE_COMMERCIAL:
+            return commercial_mode
+        return self.prod_scope == PROD_SCOPE_ALWAYS
+
+
+DASHBOARD_SECTION_GROUPS: Tuple[SectionGroup, ...] = (
+    SectionGroup(
+        header="KPIs - Consulta de Informacion e Incidencias",
+        types=("Consulta de informacion", "Incidencia"),
+        prod_scope=PROD_SCOPE_ALWAYS,
+        empty_warning="No hay datos para Consulta de Informacion e Incidencias con los filtros seleccionados.",
+        sections=(
+            SectionSpec("Consulta e Incidencias - Flujo", "render_incidents_table", {}),
+            SectionSpec(
+                "Consulta e Incidencias - Clientes",
+                "render_cliente_mensual_section",
+                {
+                    "export_chart_label": "Consulta e Incidencias - Clientes",
+                    "chart_key_suffix": "incidencias_cliente_mensual",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec(
+                "Consulta e Incidencias - Team",
+                "render_team_section",
+                {
+                    "export_chart_label": "Consulta e Incidencias - Team",
+                    "chart_key_suffix": "incidencias_team",
+                },
+                context_args=("prod_only",),
+                hide_in_commercial=True,
+            ),
+            SectionSpec(
+                "Consulta e Incidencias - Criticidad",
+                "render_criticidad_section",
+                {
+                    "export_chart_label": "Consulta e Incidencias - Criticidad",
+                    "chart_key_suffix": "incidencias_criticidad",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec("Consulta e Incidencias - SLA", "render_resolucion_section", {}),
+            SectionSpec(
+                "Consulta e Incidencias - SLA por Criticidad",
+                "render_sla_criticidad_section",
+                {
+                    "export_chart_label": "Consulta e Incidencias - SLA por Criticidad",
+                    "chart_key_suffix": "incidencias_sla_criticidad",
+                },
+            ),
+            SectionSpec(
+                "Consulta e Incidencias - Modulo",
+                "render_modulo_section",
+                {
+                    "export_chart_label": "Consulta e Incidencias - Modulo",
+                    "chart_key_suffix": "incidencias_modulo",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec(
+                "Consulta e Incidencias - Ambiente",
+                "render_ambiente_section",
+                {"export_chart_label": "Consulta e Incidencias - Ambiente"},
+                hide_in_commercial=True,
+            ),
+            SectionSpec(
+                "Consulta e Incidencias - Estado",
+                "render_estado_section",
+                {
+                    "export_chart_label": "Consulta e Incidencias - Estado",
+                    "chart_key_suffix": "incidencias_estado",
+                },
+                context_args=("prod_only", "commercial_mode", "show_unresolved_ticket_ids"),
+            ),
+        ),
+    ),
+    SectionGroup(
+        header="KPIs - Solicitudes de Cambio",
+        types=("Cambio",),
+        prod_scope=PROD_SCOPE_COMMERCIAL,
+        empty_warning="No hay datos para Solicitudes de Cambio con los filtros seleccionados.",
+        sections=(
+            SectionSpec(
+                "Cambios - Clientes",
+                "render_cliente_mensual_section",
+                {
+                    "export_chart_label": "Cambios - Clientes",
+                    "chart_key_suffix": "cambios_cliente_mensual",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec(
+                "Cambios - Team",
+                "render_team_section",
+                {
+                    "export_chart_label": "Cambios - Team",
+                    "chart_key_suffix": "cambios_team",
+                },
+                context_args=("prod_only",),
+                hide_in_commercial=True,
+            ),
+            SectionSpec(
+                "Cambios - Modulo",
+                "render_modulo_section",
+                {
+                    "export_chart_label": "Cambios - Modulo",
+                    "chart_key_suffix": "cambios_modulo",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec(
+                "Cambios - Estado",
+                "render_estado_section",
+                {
+                    "export_chart_label": "Cambios - Estado",
+                    "chart_key_suffix": "cambios_estado",
+                    "commercial_mode": False,
+                },
+                context_args=("prod_only",),
+            ),
+        ),
+    ),
+    SectionGroup(
+        header="KPIs - Solicitudes de Mejoras Técnicas",
+        types=("Interno",),
+        prod_scope=PROD_SCOPE_NEVER,
+        empty_warning="No hay datos para Solicitudes de Mejoras Técnicas con los filtros seleccionados.",
+        sections=(
+            SectionSpec(
+                "Internos - Team",
+                "render_team_section",
+                {
+                    "export_chart_label": "Internos - Team",
+                    "chart_key_suffix": "internos_team",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec(
+                "Internos - Modulo",
+                "render_modulo_section",
+                {
+                    "export_chart_label": "Internos - Modulo",
+                    "chart_key_suffix": "internos_modulo",
+                },
+                context_args=("prod_only",),
+            ),
+            SectionSpec(
+                "Internos - Estado",
+                "render_estado_section",
+                {
+                    "export_chart_label": "Internos - Estado",
+                    "chart_key_suffix": "internos_estado",
+                    "commercial_mode": False,
+                },
+                context_args=("prod_only",),
+            ),
+        ),
+        hide_in_commercial=True,
+    ),
+)
@@ -4,10 +4,7 @@ from typing import Optional
 import pandas as pd
 import streamlit as st
 
-from utils import (
-    map_priority_sort,
-    normalize_priority_labels,
-)
+from utils import normalize_priority_labels, stack_year_tables
 
 from .presentation_helpers import (
     info_no_data_year,
@@ -28,57 +25,56 @@ class SlaSectionsRenderer(SectionRendererBase):
         st.subheader("KPI - Service Level Agreement (SLA)")
         current_year, years = self._year_window(selected_year)
 
+        if self.filter.resolved_window_slice(base_filtered, years, prod_only=True).empty:
+            for year in years:
+                info_no_data_year(year)
+            warning_no_data_section("KPI - SLA")
+            return None
+
         tables = []
         for year in years:
-            sla_base = self.filter.filter_resolved_by_year(base_filtered, year)
-            sla_prod = self.filter.filter_production_environment(sla_base)
+            sla_prod = self.filter.resolved_year_slice(base_filtered, year, prod_only=True)
             if sla_prod.empty:
                 info_no_data_year(year)
                 continue
 
-            sla_prod = sla_prod.copy()
-            sla_prod["Mes"] = pd.to_datetime(sla_prod["Hora de resolucion"], errors="coerce").dt.month
-            sla_prod["Estado de resolucion"] = self._normalize_resolution_status_for_display(
-                sla_prod["Estado de resolucion"]
+            sla_prod = self._relabel(
+                sla_prod,
+                ["ID del ticket"],
+                Mes=sla_prod["Mes Resolucion"],
+                **{
+                    "Estado de resolucion": self._normalize_resolution_status_for_display(
+                        sla_prod["Estado de resolucion"]
+                    )
+                },
             )
 
-            pivot = self.table_builder.build_pivot_table(
+            pivot = self._build_pivot(
                 sla_prod, "Estado de resolucion", "Sin estado de resolución"
             )
             pivot = self.table_builder.add_sla_percentage_row(pivot)
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - SLA")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Estado de resolucion"
-        formatted_table = self._format_table(
-            combined_table,
-            coerce_numeric=False,
-            replace_comma_with_dot=False,
-        )
+        combined_table = stack_year_tables(tables, "Estado de resolucion")
+        formatted_table = self._format_table(combined_table, coerce_numeric=False)
         self._render_table_in_details_expander(formatted_table, "SLA")
 
         chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered.copy()
-        chart_df = chart_df[pd.to_datetime(chart_df["Hora de resolucion"], errors="coerce").dt.year.isin(chart_years)]
-        chart_df = self.filter.filter_production_environment(chart_df)
+        chart_df = self.filter.resolved_window_slice(base_filtered, chart_years, prod_only=True)
         if not chart_df.empty:
-            chart_df = chart_df.copy()
-            chart_df["Periodo"] = (
-                pd.to_datetime(chart_df["Hora de resolucion"], errors="coerce")
-                .dt.to_period("M")
-                .dt.to_timestamp()
-            )
-            chart_df["Estado de resolucion"] = self._normalize_resolution_status_for_display(
-                chart_df["Estado de resolucion"]
+            chart_df = self._relabel(
+                chart_df,
+                ["ID del ticket"],
+                Periodo=chart_df["Periodo Resolucion"],
+                **{
+                    "Estado de resolucion": self._normalize_resolution_status_for_display(
+                        chart_df["Estado de resolucion"]
+                    )
+                },
             )
             sla_fig = self.chart_renderer.render_trend_chart(
                 chart_df,
@@ -100,11 +96,11 @@ class SlaSectionsRenderer(SectionRendererBase):
         st.subheader("KPI - SLA por Criticidad")
         current_year, years = self._year_window(selected_year)
 
-        status_order_map = {"Incumplido": 0, "Cumplido": 1}
+        expected_statuses = ["Incumplido", "Cumplido"]
         expected_priorities = ["Urgente", "Alta", "Media", "Baja"]
         expected_labels = [
             f"{status} - {priority}"
-            for status in ["Incumplido", "Cumplido"]
+            for status in expected_statuses
             for priority in expected_priorities
         ]
 
@@ -118,34 +114,28 @@ class SlaSectionsRenderer(SectionRendererBase):
         tables = []
         chart_frames = []
         for year in years:
-            sla_base = self.filter.filter_resolved_by_year(base_filtered, year)
-            sla_prod = self.filter.filter_production_environment(sla_base)
+            sla_prod = self.filter.resolved_year_slice(base_filtered, year, prod_only=True)
             if sla_prod.empty:
                 info_no_data_year_with_zeros(year)
                 pivot_body = build_zero_pivot()
-                year_row = pd.DataFrame(
-                    [{col: pd.NA for col in pivot_body.columns}],
-                    index=[f"~~ AÑO {year} ~~"],
-                )
-                year_row.index.name = pivot_body.index.name
-                tables.extend([year_row, pivot_body])
+                tables.append((year, pivot_body))
                 continue
 
-            sla_prod = sla_prod.copy()
-            sla_prod["Estado de resolucion"] = self._normalize_resolution_status_for_display(
-                sla_prod["Estado de resolucion"]
+            sla_prod = self._relabel(
+                sla_prod,
+                ["ID del ticket", "Prioridad", "Mes Resolucion", "Periodo Resolucion"],
+                **{
+                    "Estado de resolucion": self._normalize_resolution_status_for_display(
+                        sla_prod["Estado de resolucion"]
+                    )
+                },
             )
             sla_prod["SLA Estado"] = sla_prod["Estado de resolucion"]
             sla_prod = sla_prod[sla_prod["SLA Estado"].isin(["Cumplido", "Incumplido"])]
             if sla_prod.empty:
                 info_no_sla_data_year(year)
                 pivot_body = build_zero_pivot()
-                year_row = pd.DataFrame(
-                    [{col: pd.NA for col in pivot_body.columns}],
-                    index=[f"~~ AÑO {year} ~~"],
-                )
-                year_row.index.name = pivot_body.index.name
-                tables.extend([year_row, pivot_body])
+                tables.append((year, pivot_body))
                 continue
 
             sla_prod["Prioridad ES"] = normalize_priority_labels(sla_prod["Prioridad"])
@@ -153,92 +143,39 @@ class SlaSectionsRenderer(SectionRendererBase):
             if sla_prod.empty:
                 info_no_valid_priorities_year(year)
                 pivot_body = build_zero_pivot()
-                year_row = pd.DataFrame(
-                    [{col: pd.NA for col in pivot_body.columns}],
-                    index=[f"~~ AÑO {year} ~~"],
-                )
-                year_row.index.name = pivot_body.index.name
-                tables.extend([year_row, pivot_body])
+                tables.append((year, pivot_body))
                 continue
 
-            sla_prod["SLA Criticidad"] = (
-                sla_prod["SLA Estado"].astype(str).str.strip()
-                + " - "
-                + sla_prod["Prioridad ES"].astype(str).str.strip()
+            status_codes = pd.Categorical(sla_prod["SLA Estado"], categories=expected_statuses).codes
+            priority_codes = pd.Categorical(sla_prod["Prioridad ES"], categories=expected_priorities).codes
+            sla_prod["SLA Criticidad"] = pd.Categorical.from_codes(
+                status_codes * len(expected_priorities) + priority_codes,
+                categories=expected_labels,
             )
-            sla_prod["Mes"] = pd.to_datetime(sla_prod["Hora de resolucion"], errors="coerce").dt.month
+            sla_prod["Mes"] = sla_prod["Mes Resolucion"]
 
-            pivot = self.table_builder.build_pivot_table(
+            pivot = self._build_pivot(
                 sla_prod, "SLA Criticidad", "Sin criticidad"
             )
-            pivot_body = pivot.drop(index="Total") if "Total" in pivot.index else pivot
-
-            pivot_body = pivot_body[
-                ~pivot_body.index.to_series().astype(str).str.lower().str.contains("sin criticidad", na=False)
-            ]
-
-            missing_labels = [label for label in expected_labels if label not in pivot_body.index]
-            if missing_labels:
-                missing_rows = pd.DataFrame(0, index=missing_labels, columns=pivot_body.columns)
-                pivot_body = pd.concat([pivot_body, missing_rows])
-
-            labels = pivot_body.index.to_series().astype(str)
-            status_part = labels.str.split(" - ").str[0].str.strip()
-            priority_part = labels.str.split(" - ").str[1:].str.join(" - ").str.strip()
-            status_sort = status_part.map(status_order_map).fillna(99)
-            priority_sort = map_priority_sort(priority_part).fillna(99)
-            tie_breaker = labels.str.strip().str.lower()
-            pivot_body = pivot_body.assign(
-                _status_sort=status_sort.values,
-                _priority_sort=priority_sort.values,
-                _tie=tie_breaker.values,
-            )
-            pivot_body = pivot_body.sort_values(
-                by=["_status_sort", "_priority_sort", "_tie"]
-            ).drop(columns=["_status_sort", "_priority_sort", "_tie"])
+            # expected_labels is already ordered by SLA status, then priority.
+            pivot_body = pivot.reindex(index=expected_labels, fill_value=0)
 
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot_body.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot_body.index.name
-            tables.extend([year_row, pivot_body])
+            tables.append((year, pivot_body))
             chart_frames.append(sla_prod)
 
         if not tables:
             warning_no_data_section("KPI - SLA por Criticidad")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "SLA - Criticidad"
+        combined_table = stack_year_tables(tables, "SLA - Criticidad")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "SLA por Criticidad")
 
         if chart_frames:
             chart_df = pd.concat(chart_frames, ignore_index=True)
-            chart_df["Periodo"] = (
-                pd.to_datetime(chart_df["Hora de resolucion"], errors="coerce")
-                .dt.to_period("M")
-                .dt.to_timestamp()
-            )
-            chart_labels = chart_df["SLA Criticidad"].astype(str).str.strip()
-            chart_status = chart_labels.str.split(" - ").str[0].str.strip()
-            chart_priority = chart_labels.str.split(" - ").str[1:].str.join(" - ").str.strip()
-            chart_status_sort = chart_status.map(status_order_map).fillna(99)
-            chart_priority_sort = map_priority_sort(chart_priority).fillna(99)
-            chart_order = (
-                pd.DataFrame(
-                    {
-                        "label": chart_labels,
-                        "status_sort": chart_status_sort,
-                        "priority_sort": chart_priority_sort,
-                        "tie": chart_labels.str.lower(),
-                    }
-                )
-                .drop_duplicates(subset=["label"])
-                .sort_values(by=["status_sort", "priority_sort", "tie"])["label"]
-                .tolist()
-            )
+            chart_df["Periodo"] = chart_df["Periodo Resolucion"]
+            chart_labels = set(chart_df["SLA Criticidad"].unique())
+            chart_order = [label for label in expected_labels if label in chart_labels]
             chart_fig = self.chart_renderer.render_trend_chart(
                 chart_df,
                 "SLA Criticidad",
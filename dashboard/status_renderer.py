@@ -1,12 +1,14 @@
 """Renderers for status-oriented KPI sections."""
-from typing import Optional
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from utils import COMMERCIAL_STATUS_ORDER, build_commercial_estado
+from utils import COMMERCIAL_STATUS_ORDER, build_commercial_estado, stack_year_tables
 
 from .presentation_helpers import info_no_data_year, warning_no_data_section
+from .pivot_cache import PIVOT_SOURCE_COLUMNS
 from .section_renderer_base import SectionRendererBase
 
 
@@ -24,160 +26,148 @@ class StatusSectionsRenderer(SectionRendererBase):
         show_unresolved_ticket_ids: bool = False,
     ) -> Optional[pd.DataFrame]:
         st.subheader("KPI - Estado")
-        current_year, years = self._year_window(selected_year)
+        _, years = self._year_window(selected_year)
+
+        # Estado Agrupado is materialized at preprocess time; the helper only groups legacy frames.
+        window_df = self.filter.window_slice(base_filtered, years, prod_only)
+        estado_source = "Estado Agrupado" if "Estado Agrupado" in window_df.columns else "Estado"
+        estado_window = self._build_estado_grouped(
+            window_df[[estado_source, "Año", "Periodo", *PIVOT_SOURCE_COLUMNS]], "Estado Agrupado"
+        )
+        month_order = list(range(1, 13))
+        if commercial_mode:
+            estado_window = estado_window.assign(
+                **{"Estado Comercial": build_commercial_estado(estado_window["Estado Agrupado"])}
+            )
+            commercial_counts = (
+                estado_window.dropna(subset=["Estado Comercial"])
+                .groupby(["Año", "Estado Comercial", "Mes"], observed=True)["ID del ticket"]
+                .nunique()
+            )
 
+        window_years = estado_window["Año"].to_numpy(dtype=np.int64, na_value=0)
         tables = []
         for year in years:
-            year_df = self.filter.filter_by_year(base_filtered, year)
-            if prod_only:
-                year_df = self.filter.filter_production_environment(year_df)
-            if year_df.empty:
+            year_mask = window_years == year
+            if not year_mask.any():
                 info_no_data_year(year)
                 continue
 
-            year_df = self._build_estado_grouped(year_df, "Estado Agrupado")
-
             if commercial_mode:
-                estado_df = year_df.copy()
-                estado_df["Estado Comercial"] = build_commercial_estado(estado_df["Estado Agrupado"])
-                estado_df = estado_df.dropna(subset=["Estado Comercial"])
-
-                month_order = list(range(1, 13))
-                if estado_df.empty:
-                    pivot = pd.DataFrame(0, index=COMMERCIAL_STATUS_ORDER, columns=month_order)
+                if year in commercial_counts.index.get_level_values("Año"):
+                    pivot = commercial_counts.xs(year, level="Año").unstack("Mes", fill_value=0)
+                    pivot.index = pivot.index.astype(object)
                 else:
-                    pivot = (
-                        estado_df.pivot_table(
-                            index="Estado Comercial",
-                            columns="Mes",
-                            values="ID del ticket",
-                            aggfunc="nunique",
-                            fill_value=0,
-                        )
-                        .reindex(index=COMMERCIAL_STATUS_ORDER, fill_value=0)
-                        .reindex(columns=month_order, fill_value=0)
-                    )
-                pivot.columns = [self.config.MONTH_NAMES_ES.get(m, str(m)) for m in pivot.columns]
+                    pivot = pd.DataFrame(0, index=COMMERCIAL_STATUS_ORDER, columns=month_order)
+                pivot = pivot.reindex(index=COMMERCIAL_STATUS_ORDER, columns=month_order, fill_value=0)
+                pivot = pivot.rename(columns=self.config.MONTH_NAMES_ES)
                 pivot["Total"] = pivot.sum(axis=1)
                 pivot.loc["Total"] = pivot.sum(axis=0)
             else:
-                pivot = self.table_builder.build_pivot_table(year_df, "Estado Agrupado", "Sin estado")
+                pivot = self._build_pivot(estado_window[year_mask], "Estado Agrupado", "Sin estado")
 
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             warning_no_data_section("KPI - Estado")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Estado"
+        combined_table = stack_year_tables(tables, "Estado")
         display_table = self._format_table(combined_table)
         self._render_table_in_details_expander(display_table, "Estado")
 
         if show_unresolved_ticket_ids:
-            detail_df = base_filtered[base_filtered["Año"].isin(years)].copy()
-            if prod_only:
-                detail_df = self.filter.filter_production_environment(detail_df)
+            self._render_unresolved_ticket_detail(base_filtered, years, prod_only, chart_key_suffix)
+
+        # The chart compares the same two years as the table.
+        chart_df = estado_window
+        category_order = None
+        category_col = "Estado Agrupado"
+        if commercial_mode:
+            chart_df = estado_window.dropna(subset=["Estado Comercial"])
+            category_col = "Estado Comercial"
+            category_order = COMMERCIAL_STATUS_ORDER
+
+        estado_fig = self.chart_renderer.render_trend_chart(
+            chart_df,
+            category_col,
+            None,
+            chart_key=self._build_widget_key("chart", chart_key_suffix),
+            category_order=category_order,
+        )
+        chart_label = export_chart_label or "KPI - Estado"
+        self._append_export_chart(chart_label, estado_fig)
+
+        return display_table
+
+    def _render_unresolved_ticket_detail(
+        self,
+        base_filtered: pd.DataFrame,
+        years: List[int],
+        prod_only: bool,
+        chart_key_suffix: str,
+    ) -> None:
+        """Render unresolved ticket IDs on demand; skipped work while the toggle is off."""
+        with st.expander("Detalle de tickets no resueltos", expanded=False):
+            show_detail = st.toggle(
+                "Calcular detalle de tickets no resueltos",
+                value=False,
+                key=self._build_widget_key("toggle", chart_key_suffix, "unresolved_detail"),
+            )
+            if not show_detail:
+                return
 
-            with st.expander("Detalle de tickets no resueltos", expanded=False):
-                if detail_df.empty:
-                    st.info("No hay tickets para evaluar con los filtros seleccionados.")
+            detail_df = self.filter.window_slice(base_filtered, years, prod_only)
+
+            if detail_df.empty:
+                st.info("No hay tickets para evaluar con los filtros seleccionados.")
+            else:
+                unresolved_mask = ~self._build_resolved_mask(detail_df)
+                unresolved_detail = detail_df.loc[
+                    unresolved_mask,
+                    ["ID del ticket", "Hora de creacion", "Mes", "Año"],
+                ]
+                ticket_ids = unresolved_detail["ID del ticket"].astype(pd.StringDtype("pyarrow")).str.strip()
+                keep = (ticket_ids.ne("").fillna(False) & ~ticket_ids.duplicated()).to_numpy(dtype=bool)
+                unresolved_detail = unresolved_detail[keep]
+                ticket_ids = ticket_ids[keep]
+
+                if unresolved_detail.empty:
+                    st.info("No hay tickets no resueltos con los filtros seleccionados.")
                 else:
-                    unresolved_mask = ~self._build_resolved_mask(detail_df)
-                    unresolved_detail = detail_df.loc[
-                        unresolved_mask,
-                        ["ID del ticket", "Hora de creacion", "Mes", "Año"],
-                    ].copy()
-                    unresolved_detail["ID del ticket"] = (
-                        unresolved_detail["ID del ticket"].astype(str).str.strip()
-                    )
-                    unresolved_detail = unresolved_detail[
-                        unresolved_detail["ID del ticket"].ne("")
-                    ].drop_duplicates(subset=["ID del ticket"])
-
-                    month_from_creation = pd.to_datetime(
-                        unresolved_detail["Hora de creacion"], errors="coerce"
-                    ).dt.month
-                    month_fallback = pd.to_numeric(unresolved_detail["Mes"], errors="coerce")
-                    unresolved_detail["Mes Num"] = month_from_creation.fillna(month_fallback)
-                    unresolved_detail["Mes Num"] = (
-                        pd.to_numeric(unresolved_detail["Mes Num"], errors="coerce")
+                    creation_time = unresolved_detail["Hora de creacion"]
+                    month_num = (
+                        creation_time.dt.month
+                        .fillna(pd.to_numeric(unresolved_detail["Mes"], errors="coerce"))
                         .fillna(0)
                         .astype(int)
                     )
-                    unresolved_detail["Mes"] = unresolved_detail["Mes Num"].map(
-                        lambda month: self.config.MONTH_NAMES_ES.get(month, "Sin mes")
-                    )
-                    unresolved_detail["Año Ref"] = pd.to_datetime(
-                        unresolved_detail["Hora de creacion"], errors="coerce"
-                    ).dt.year
-                    unresolved_detail["Año Ref"] = (
-                        unresolved_detail["Año Ref"]
+                    year_ref = (
+                        creation_time.dt.year
                         .fillna(pd.to_numeric(unresolved_detail["Año"], errors="coerce"))
                         .fillna(0)
                         .astype(int)
                     )
-
-                    unresolved_detail = unresolved_detail.sort_values(
-                        by=["Año Ref", "Mes Num", "ID del ticket"],
-                        ascending=[False, True, True],
+                    # One Arrow sort up front; groupby keeps row order, so each list comes out sorted.
+                    grouped_detail = (
+                        pd.DataFrame({"Año Ref": year_ref, "Mes Num": month_num, "casos": ticket_ids})
+                        .sort_values(by="casos", kind="stable")
+                        .groupby(["Año Ref", "Mes Num"], sort=False)["casos"]
+                        .agg(list)
+                        .reset_index()
+                    )
+                    grouped_detail["Mes"] = (
+                        grouped_detail["Mes Num"].map(self.config.MONTH_NAMES_ES).fillna("Sin mes")
+                    )
+                    grouped_detail["total"] = grouped_detail["casos"].map(len)
+
+                    unresolved_payload = (
+                        grouped_detail.sort_values(by=["Año Ref", "Mes Num"], ascending=[False, True])
+                        .rename(columns={"Año Ref": "anio", "Mes": "mes"})
+                        [["anio", "mes", "casos", "total"]]
+                        .astype({"anio": "int64", "total": "int64"})
+                        .to_dict(orient="records")
                     )
 
-                    if unresolved_detail.empty:
-                        st.info("No hay tickets no resueltos con los filtros seleccionados.")
-                    else:
-                        grouped_detail = (
-                            unresolved_detail.groupby(["Año Ref", "Mes Num", "Mes"], as_index=False)
-                            .agg(casos=("ID del ticket", lambda values: sorted(pd.unique(values).tolist())))
-                        )
-                        grouped_detail["total"] = grouped_detail["casos"].map(len)
-
-                        unresolved_payload = [
-                            {
-                                "anio": int(row["Año Ref"]),
-                                "mes": row["Mes"],
-                                "casos": row["casos"],
-                                "total": int(row["total"]),
-                            }
-                            for _, row in grouped_detail.sort_values(
-                                by=["Año Ref", "Mes Num"],
-                                ascending=[False, True],
-                            ).iterrows()
-                        ]
-
-                        st.caption(
-                            f"Total de tickets no resueltos: {len(unresolved_detail['ID del ticket'])}"
-                        )
-                        st.json(unresolved_payload)
-
-        chart_years = [current_year - 1, current_year]
-        chart_df = base_filtered[base_filtered["Año"].isin(chart_years)].copy()
-        if prod_only:
-            chart_df = self.filter.filter_production_environment(chart_df)
-        if not chart_df.empty:
-            chart_df = self._build_estado_grouped(chart_df, "Estado Agrupado")
-            category_order = None
-            category_col = "Estado Agrupado"
-            if commercial_mode:
-                chart_df = chart_df.copy()
-                chart_df["Estado Comercial"] = build_commercial_estado(chart_df["Estado Agrupado"])
-                chart_df = chart_df.dropna(subset=["Estado Comercial"])
-                category_col = "Estado Comercial"
-                category_order = COMMERCIAL_STATUS_ORDER
-
-            estado_fig = self.chart_renderer.render_trend_chart(
-                chart_df,
-                category_col,
-                None,
-                chart_key=self._build_widget_key("chart", chart_key_suffix),
-                category_order=category_order,
-            )
-            chart_label = export_chart_label or "KPI - Estado"
-            self._append_export_chart(chart_label, estado_fig)
-
-        return display_table
+                    st.caption(f"Total de tickets no resueltos: {len(ticket_ids)}")
+                    st.json(unresolved_payload)
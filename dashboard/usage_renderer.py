@@ -1,12 +1,48 @@
 """Usage table rendering for dashboard logins data."""
 from typing import Callable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from config import AppConfig
 from ui import ChartRenderer
-from utils import TextNormalizer, format_numeric_display_table, resolve_comparison_years
+from utils import (
+    TextNormalizer,
+    coerce_numeric_table,
+    resolve_comparison_years,
+    stack_year_tables,
+)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def normalize_usage_frame(
+    usage_source: pd.DataFrame,
+    col_cliente: str,
+    col_logins: str,
+    col_mes: str,
+    col_anio: str,
+) -> pd.DataFrame:
+    """Build/cached the renamed logins frame with normalized client labels and numeric values."""
+    usage = usage_source.rename(
+        columns={
+            col_cliente: "cliente",
+            col_logins: "logins",
+            col_mes: "mes",
+            col_anio: "anio",
+        }
+    )
+    usage["cliente_original"] = usage["cliente"].astype(str)
+    client_names = usage["cliente_original"].astype("category")
+    usage["cliente_display"] = client_names.map(TextNormalizer.remove_accents).astype(object)
+    usage["cliente_norm"] = client_names.map(TextNormalizer.normalize_column_name).astype("category")
+    usage["cliente"] = usage["cliente_display"]
+    anio = pd.to_numeric(usage["anio"], errors="coerce")
+    # Malformed years (fractional or outside Int16) become NA instead of failing the cast.
+    usage["anio"] = anio.where(anio.eq(anio.round()) & anio.abs().le(np.iinfo(np.int16).max)).astype("Int16")
+    usage["logins"] = pd.to_numeric(usage["logins"], errors="coerce").fillna(0).astype(np.float64)
+    usage["Cliente"] = usage["cliente_display"]
+    return usage
 
 
 class UsageRenderer:
@@ -15,6 +51,8 @@ class UsageRenderer:
     def __init__(self, config: AppConfig, chart_renderer: ChartRenderer):
         self.config = config
         self.chart_renderer = chart_renderer
+        self._month_name_index = pd.Index([name.lower() for name in config.MONTH_NAMES_ES.values()])
+        self._month_keys = np.array(list(config.MONTH_NAMES_ES.keys()), dtype=float)
 
     def render_usage_table(
         self,
@@ -31,16 +69,12 @@ class UsageRenderer:
             st.info("No hay datos de logins para mostrar.")
             return None
 
-        def resolve_column(df: pd.DataFrame, target: str) -> Optional[str]:
-            for col in df.columns:
-                if col.strip().lower() == target:
-                    return col
-            return None
-
-        col_cliente = resolve_column(usage_df, "cliente")
-        col_logins = resolve_column(usage_df, "logins")
-        col_mes = resolve_column(usage_df, "mes")
-        col_anio = resolve_column(usage_df, "año") or resolve_column(usage_df, "anio")
+        # First column wins when several normalize to the same name.
+        columns_by_name = {col.strip().lower(): col for col in reversed(usage_df.columns)}
+        col_cliente = columns_by_name.get("cliente")
+        col_logins = columns_by_name.get("logins")
+        col_mes = columns_by_name.get("mes")
+        col_anio = columns_by_name.get("año") or columns_by_name.get("anio")
 
         missing_cols = [
             name
@@ -58,21 +92,13 @@ class UsageRenderer:
             )
             return None
 
-        usage = usage_df.rename(
-            columns={
-                col_cliente: "cliente",
-                col_logins: "logins",
-                col_mes: "mes",
-                col_anio: "anio",
-            }
-        ).copy()
-        usage["cliente_original"] = usage["cliente"].astype(str)
-        usage["cliente_display"] = usage["cliente_original"].map(TextNormalizer.remove_accents)
-        usage["cliente_norm"] = usage["cliente_original"].map(TextNormalizer.normalize_column_name)
-        usage["cliente"] = usage["cliente_display"]
-        usage["anio"] = pd.to_numeric(usage["anio"], errors="coerce")
-        usage["logins"] = pd.to_numeric(usage["logins"], errors="coerce").fillna(0)
-        usage["Cliente"] = usage["cliente_display"]
+        usage = normalize_usage_frame(
+            usage_df[[col_cliente, col_logins, col_mes, col_anio]],
+            col_cliente,
+            col_logins,
+            col_mes,
+            col_anio,
+        )
 
         if selected_client:
             selected_clients_norm = {
@@ -85,21 +111,19 @@ class UsageRenderer:
             st.info("No hay datos de logins para los filtros seleccionados.")
             return None
 
-        month_map = {name.lower(): num for num, name in self.config.MONTH_NAMES_ES.items()}
         month_numeric = pd.to_numeric(usage["mes"], errors="coerce")
         if month_numeric.notna().any():
             usage["mes_num"] = month_numeric
         else:
-            usage["mes_num"] = (
-                usage["mes"].astype(str).str.strip().str.lower().map(month_map)
-            )
+            usage["mes_num"] = self._month_numbers_from_names(usage["mes"])
 
-        usage = usage.dropna(subset=["mes_num"])
+        # Out-of-range months would wrap in the int8 cast and land in another month's column.
+        usage = usage[usage["mes_num"].between(1, 12)]
         if usage.empty:
             st.info("No hay meses validos para los filtros seleccionados.")
             return None
 
-        usage["mes_num"] = usage["mes_num"].astype(int)
+        usage["mes_num"] = usage["mes_num"].astype(np.int8)
 
         _, years = resolve_comparison_years(selected_year)
 
@@ -110,36 +134,27 @@ class UsageRenderer:
                 st.info(f"ℹ️ No hay datos de logins para el año {year}")
                 continue
             pivot = (
-                year_usage.groupby(["cliente", "mes_num"])["logins"]
+                year_usage.groupby(["cliente", "mes_num"], observed=True)["logins"]
                 .sum()
                 .unstack(fill_value=0)
-                .sort_index()
+                .reindex(columns=range(1, 13), fill_value=0)
             )
-
-            month_order = list(range(1, 13))
-            pivot = pivot.reindex(columns=month_order, fill_value=0)
-            pivot.columns = [self.config.MONTH_NAMES_ES.get(m, str(m)) for m in pivot.columns]
+            pivot = pivot.rename(columns=self.config.MONTH_NAMES_ES)
             pivot["Total"] = pivot.sum(axis=1)
-            pivot = pivot.sort_values(by="Total", ascending=False)
+            pivot = pivot.sort_values(by="Total", ascending=False, kind="stable")
             pivot.index.name = "Cliente"
 
-            year_row = pd.DataFrame(
-                [{col: pd.NA for col in pivot.columns}],
-                index=[f"~~ AÑO {year} ~~"],
-            )
-            year_row.index.name = pivot.index.name
-            tables.extend([year_row, pivot])
+            tables.append((year, pivot))
 
         if not tables:
             st.warning("No hay datos de logins para los filtros seleccionados.")
             return None
 
-        combined_table = pd.concat(tables)
-        combined_table.index.name = "Cliente"
-        display_table = format_numeric_display_table(combined_table)
+        combined_table = stack_year_tables(tables, "Cliente")
+        display_table = coerce_numeric_table(combined_table)
         render_table_in_details_expander(display_table, "Usabilidad")
 
-        usage_chart = usage[usage["anio"].isin(years)].copy()
+        usage_chart = usage[usage["anio"].isin(years)]
         if not usage_chart.empty:
             usage_fig = self.chart_renderer.render_usage_trend_chart(
                 usage_chart,
@@ -149,3 +164,14 @@ class UsageRenderer:
             export_charts.append(("Usabilidad - Actividad", usage_fig))
 
         return display_table
+
+    def _month_numbers_from_names(self, months: pd.Series) -> pd.Series:
+        """Map Spanish month names to 1-12 through categorical codes (unknown names become NaN)."""
+        month_labels = months.astype(str).astype("category")
+        normalized_labels = month_labels.cat.categories.str.strip().str.lower()
+        month_index = self._month_name_index.get_indexer(normalized_labels)
+        month_numbers = np.append(
+            np.where(month_index >= 0, self._month_keys[month_index], np.nan),
+            np.nan,
+        )
+        return pd.Series(month_numbers[month_labels.cat.codes.to_numpy()], index=months.index)
@@ -1,9 +1,12 @@
 """Data filtering functionality."""
-from typing import List, Optional, Union
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+import weakref
+
+import numpy as np
 import pandas as pd
 
 from config import AppConfig
-from utils import TextNormalizer
+from utils import TextNormalizer, normalize_priority_labels
 
 
 class DataFilter:
@@ -25,6 +28,12 @@ class DataFilter:
         "Media": 2,
         "Baja": 3,
     }
+    ROW_INDEX_COLUMNS = ("Grupo", "Team Asignado", "Tipo")
+    CRITICIDAD_INDEX_KEY = "Criticidad"
+
+    _row_index_cache: Dict[int, Dict[str, Dict[object, np.ndarray]]] = {}
+    _slice_cache: Dict[int, Dict[Tuple[Hashable, ...], pd.DataFrame]] = {}
+    _environment_mask_cache: Dict[int, np.ndarray] = {}
     
     def __init__(self, config: AppConfig):
         self.config = config
@@ -37,23 +46,116 @@ class DataFilter:
     
     def filter_by_client(self, df: pd.DataFrame, client: Union[str, List[str]]) -> pd.DataFrame:
         """Filter data by client/group."""
-        if "Grupo" not in df.columns:
-            return df
-
-        if isinstance(client, list):
-            if not client:
-                return df
-            return df[df["Grupo"].isin(client)]
-
-        if not client or client == "Todos":
-            return df
-        return df[df["Grupo"] == client]
+        return self.select_positions(df, self.positions_by_criteria(df, client, [], []))
     
     def filter_by_team(self, df: pd.DataFrame, team: List[str]) -> pd.DataFrame:
         """Filter data by team asignado."""
-        if not team or "Team Asignado" not in df.columns:
-            return df
-        return df[df["Team Asignado"].isin(team)]
+        return self.select_positions(df, self.positions_by_criteria(df, [], team, []))
+
+    def filter_by_criteria(
+        self,
+        df: pd.DataFrame,
+        client: Union[str, List[str]],
+        team: List[str],
+        criticidades: List[str],
+        types: List[str],
+    ) -> pd.DataFrame:
+        """Filter by client, team, criticidad and types selecting rows only once."""
+        return self.select_positions(df, self.positions_by_criteria(df, client, team, criticidades, types))
+
+    def positions_by_criteria(
+        self,
+        df: pd.DataFrame,
+        client: Union[str, List[str]],
+        team: List[str],
+        criticidades: List[str],
+        types: Optional[List[str]] = None,
+    ) -> Optional[np.ndarray]:
+        """Return sorted row positions matching every filter, or None when no filtering applies."""
+        row_index = self.build_row_index(df)
+        if isinstance(client, list):
+            selected_clients = client
+        else:
+            selected_clients = [] if not client or client == "Todos" else [client]
+        selected_criticidades = [str(value).strip() for value in criticidades or [] if str(value).strip()]
+
+        return self.combine_positions(
+            self._lookup_positions(row_index, "Grupo", selected_clients),
+            self._lookup_positions(row_index, "Team Asignado", team),
+            self._lookup_positions(row_index, self.CRITICIDAD_INDEX_KEY, selected_criticidades),
+            self._lookup_positions(row_index, "Tipo", types),
+        )
+
+    def positions_by_types(self, df: pd.DataFrame, types: Optional[List[str]]) -> Optional[np.ndarray]:
+        """Return sorted row positions for the given ticket types, or None when no filtering applies."""
+        return self._lookup_positions(self.build_row_index(df), "Tipo", types)
+
+    def build_row_index(self, df: pd.DataFrame) -> Dict[str, Dict[object, np.ndarray]]:
+        """Return memoized {column: {value: row positions}} lookup for the filter columns."""
+        df_id = id(df)
+        cached_index = DataFilter._row_index_cache.get(df_id)
+        if cached_index is not None:
+            return cached_index
+
+        row_index = {
+            col: df.groupby(col, sort=False, observed=True).indices
+            for col in self.ROW_INDEX_COLUMNS
+            if col in df.columns
+        }
+        if "Prioridad" in df.columns:
+            criticidad_series = self._build_criticidad_series(df)
+            row_index[self.CRITICIDAD_INDEX_KEY] = criticidad_series.groupby(
+                criticidad_series, sort=False, observed=True
+            ).indices
+
+        weakref.finalize(df, DataFilter._row_index_cache.pop, df_id, None)
+        DataFilter._row_index_cache[df_id] = row_index
+        return row_index
+
+    @staticmethod
+    def _lookup_positions(
+        row_index: Dict[str, Dict[object, np.ndarray]],
+        key: str,
+        values: Optional[Iterable[object]],
+    ) -> Optional[np.ndarray]:
+        """Gather sorted row positions for the selected values of one indexed column."""
+        if not values or key not in row_index:
+            return None
+        value_index = row_index[key]
+        matches = [value_index[value] for value in values if value in value_index]
+        if not matches:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(matches))
+
+    @staticmethod
+    def combine_positions(*positions: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Intersect sorted row positions, ignoring None (no filter) entries."""
+        active_positions = sorted(
+            (item for item in positions if item is not None),
+            key=len,
+        )
+        if not active_positions:
+            return None
+
+        combined = active_positions[0]
+        for item in active_positions[1:]:
+            if combined.size == 0:
+                break
+            combined = np.intersect1d(combined, item, assume_unique=True)
+        return combined
+
+    @staticmethod
+    def select_positions(
+        df: pd.DataFrame,
+        positions: Optional[np.ndarray],
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Gather rows by position and, optionally, only the given columns in a single take."""
+        if columns is None:
+            return df if positions is None else df.iloc[positions]
+        column_positions = df.columns.get_indexer([col for col in columns if col in df.columns])
+        row_positions = slice(None) if positions is None else positions
+        return df.iloc[row_positions, column_positions]
 
     def get_criticidad_options(self, df: pd.DataFrame) -> List[str]:
         """Return available criticidad options in Spanish labels."""
@@ -66,39 +168,133 @@ class DataFilter:
 
     def filter_by_criticidad(self, df: pd.DataFrame, criticidades: List[str]) -> pd.DataFrame:
         """Filter data by criticidad/prioridad."""
-        if not criticidades or "Prioridad" not in df.columns:
-            return df
-        normalized_selected = {str(value).strip() for value in criticidades if str(value).strip()}
-        if not normalized_selected:
-            return df
-
-        criticidad_series = self._build_criticidad_series(df)
-        return df[criticidad_series.isin(normalized_selected)]
+        return self.select_positions(df, self.positions_by_criteria(df, [], [], criticidades))
 
     def _build_criticidad_series(self, df: pd.DataFrame) -> pd.Series:
         """Normalize Prioridad values to Spanish criticidad labels."""
         if "Prioridad" not in df.columns:
             return pd.Series(index=df.index, dtype="string")
 
-        prioridad_norm = df["Prioridad"].astype("string").str.strip().str.lower()
-        criticidad_series = prioridad_norm.map(self.PRIORITY_LABEL_MAP).fillna("Sin criticidad")
-        return criticidad_series.astype("string")
+        return normalize_priority_labels(df["Prioridad"]).astype("string")
     
     def filter_by_types(self, df: pd.DataFrame, types: List[str]) -> pd.DataFrame:
         """Filter data by ticket types."""
-        if not types or "Tipo" not in df.columns:
-            return df
-        return df[df["Tipo"].isin(types)]
-    
+        return self.select_positions(df, self.positions_by_types(df, types))
+
     def filter_production_environment(self, df: pd.DataFrame) -> pd.DataFrame:
         """Filter data for production environments only."""
         if "Ambiente" not in df.columns:
             return df
-        ambiente_norm = df["Ambiente"].apply(TextNormalizer.normalize_environment)
-        return df[ambiente_norm.isin(self.config.PROD_ENVIRONMENTS)].copy()
+        return df[self.production_environment_mask(df)]
+
+    def production_environment_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Return the memoized productive-environment mask, normalizing each distinct Ambiente once."""
+        df_id = id(df)
+        cached_mask = DataFilter._environment_mask_cache.get(df_id)
+        if cached_mask is not None:
+            return cached_mask
+
+        if "Ambiente" not in df.columns:
+            mask = np.ones(len(df), dtype=bool)
+        else:
+            codes, environments = pd.factorize(df["Ambiente"], use_na_sentinel=False)
+            prod_environments = np.array(
+                [
+                    TextNormalizer.normalize_environment(environment) in self.config.PROD_ENVIRONMENTS
+                    for environment in environments
+                ],
+                dtype=bool,
+            )
+            mask = prod_environments[codes]
+
+        weakref.finalize(df, DataFilter._environment_mask_cache.pop, df_id, None)
+        DataFilter._environment_mask_cache[df_id] = mask
+        return mask
+    
+    def year_slice(self, df: pd.DataFrame, year: Optional[int], prod_only: bool) -> pd.DataFrame:
+        """Return memoized rows created in a year, optionally restricted to productive environments."""
+        if year is None or "Año" not in df.columns:
+            return self._memoized_slice(
+                df, ("year", year, prod_only), lambda: self._restrict_environment(df, prod_only)
+            )
+        return self._memoized_slice(
+            df,
+            ("year", year, prod_only),
+            lambda: self._select_rows_in_scope(df, (df["Año"] == year).to_numpy(dtype=bool, na_value=False), prod_only),
+        )
+
+    def window_slice(self, df: pd.DataFrame, years: List[int], prod_only: bool) -> pd.DataFrame:
+        """Return memoized rows created in any of the given years, optionally productive only."""
+        return self._memoized_slice(
+            df,
+            ("window", tuple(years), prod_only),
+            lambda: self._select_rows_in_scope(df, df["Año"].isin(years).to_numpy(dtype=bool, na_value=False), prod_only),
+        )
+
+    def resolved_year_slice(self, df: pd.DataFrame, year: Optional[int], prod_only: bool) -> pd.DataFrame:
+        """Return memoized rows resolved in a year, optionally restricted to productive environments."""
+        if year is None or "Hora de resolucion" not in df.columns:
+            return self._memoized_slice(
+                df, ("resolved_year", year, prod_only), lambda: self._restrict_environment(df, prod_only)
+            )
+        return self._memoized_slice(
+            df,
+            ("resolved_year", year, prod_only),
+            lambda: self._select_rows_in_scope(
+                df, (self._resolution_years(df) == year).to_numpy(dtype=bool, na_value=False), prod_only
+            ),
+        )
+
+    def resolved_window_slice(self, df: pd.DataFrame, years: List[int], prod_only: bool) -> pd.DataFrame:
+        """Return memoized rows resolved in any of the given years, optionally productive only."""
+        return self._memoized_slice(
+            df,
+            ("resolved_window", tuple(years), prod_only),
+            lambda: self._select_rows_in_scope(
+                df,
+                self._resolution_years(df).isin(years).to_numpy(dtype=bool, na_value=False),
+                prod_only,
+            ),
+        )
+
+    def _restrict_environment(self, df: pd.DataFrame, prod_only: bool) -> pd.DataFrame:
+        """Apply the productive environment filter when requested."""
+        return self.filter_production_environment(df) if prod_only else df
+
+    def _select_rows_in_scope(self, df: pd.DataFrame, row_mask: np.ndarray, prod_only: bool) -> pd.DataFrame:
+        """Select masked rows, AND-ing the base frame's productive mask when requested."""
+        if prod_only:
+            row_mask = row_mask & self.production_environment_mask(df)
+        return df[row_mask]
+
+    @staticmethod
+    def _memoized_slice(
+        df: pd.DataFrame,
+        key: Tuple[Hashable, ...],
+        build: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Build a read-only slice once per live section base and key."""
+        if df.empty:
+            return df
+        df_id = id(df)
+        slices = DataFilter._slice_cache.get(df_id)
+        if slices is None:
+            slices = {}
+            weakref.finalize(df, DataFilter._slice_cache.pop, df_id, None)
+            DataFilter._slice_cache[df_id] = slices
+        if key not in slices:
+            slices[key] = build()
+        return slices[key]
     
     def filter_resolved_by_year(self, df: pd.DataFrame, year: Optional[int]) -> pd.DataFrame:
         """Filter resolved tickets by resolution year."""
         if year is None or "Hora de resolucion" not in df.columns:
             return df
-        return df[pd.to_datetime(df["Hora de resolucion"], errors="coerce").dt.year == year]
+        return df[self._resolution_years(df) == year]
+
+    @staticmethod
+    def _resolution_years(df: pd.DataFrame) -> pd.Series:
+        """Return the resolution year, reading the ingest column when available."""
+        if "Año Resolucion" in df.columns:
+            return df["Año Resolucion"]
+        return pd.to_datetime(df["Hora de resolucion"], errors="coerce").dt.year
@@ -1,9 +1,13 @@
 """Excel data loading functionality."""
+import importlib.util
 import io
 from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+# python-calamine (Rust reader) is optional; fall back to openpyxl when it is not installed.
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
 
 class ExcelDataLoader:
     """Handles loading data from Excel files."""
@@ -12,7 +16,7 @@ class ExcelDataLoader:
     @st.cache_data(show_spinner=False)
     def load(file_bytes: bytes) -> pd.DataFrame:
         """Load Excel file from bytes."""
-        return pd.read_excel(io.BytesIO(file_bytes), engine="openpyxl")
+        return pd.read_excel(io.BytesIO(file_bytes), engine=EXCEL_ENGINE)
 
 
 class FreshdeskSnapshotLoader:
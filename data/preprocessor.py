@@ -2,7 +2,7 @@
 import pandas as pd
 
 from config import AppConfig
-from utils import TextNormalizer
+from utils import TextNormalizer, TicketStatusHelper
 
 
 class DataPreprocessor:
@@ -17,8 +17,11 @@ class DataPreprocessor:
         df = self._parse_datetime_columns(df)
         df = self._parse_numeric_columns(df)
         df = self._clean_text_columns(df)
+        df = self._convert_categorical_columns(df)
+        df = self._convert_string_columns(df)
         df = self._add_temporal_columns(df)
         df = self._add_composite_columns(df)
+        df = self._add_status_columns(df)
         return df
     
     def _clean_duplicate_columns(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -38,7 +41,9 @@ class DataPreprocessor:
         """Convert datetime columns to proper datetime type."""
         for col in self.config.DATETIME_COLUMNS:
             if col in df.columns:
-                parsed = pd.to_datetime(df[col], errors="coerce")
+                parsed = df[col]
+                if not pd.api.types.is_datetime64_any_dtype(parsed):
+                    parsed = pd.to_datetime(parsed, errors="coerce", cache=True)
                 # Evita warnings posteriores con to_period("M") en series con tz.
                 if getattr(parsed.dt, "tz", None) is not None:
                     parsed = parsed.dt.tz_localize(None)
@@ -60,16 +65,39 @@ class DataPreprocessor:
                 df[col] = TextNormalizer.clean_text_series(df[col])
         return df
     
+    def _convert_categorical_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store low-cardinality filter columns as categoricals."""
+        for col in self.config.CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+        return df
+    
+    def _convert_string_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store remaining free-text columns as Arrow-backed strings."""
+        for col in df.select_dtypes(include="object").columns:
+            df[col] = df[col].astype(pd.StringDtype("pyarrow"))
+        return df
+    
     def _add_temporal_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add temporal helper columns."""
+        """Add temporal helper columns (years as Int16, months as Int8)."""
         if "Hora de creacion" in df.columns:
-            df["Año"] = df["Hora de creacion"].dt.year
-            df["Mes"] = df["Hora de creacion"].dt.month
+            df["Año"] = df["Hora de creacion"].dt.year.astype("Int16")
+            df["Mes"] = df["Hora de creacion"].dt.month.astype("Int8")
             df["Mes Nombre"] = df["Mes"].map(self.config.MONTH_NAMES_ES)
             df["Mes Orden"] = df["Mes"]
-            df["Periodo"] = df["Hora de creacion"].dt.to_period("M").dt.to_timestamp()
+            df["Periodo"] = self._month_start(df["Hora de creacion"])
+        if "Hora de resolucion" in df.columns:
+            df["Año Resolucion"] = df["Hora de resolucion"].dt.year.astype("Int16")
+            df["Mes Resolucion"] = df["Hora de resolucion"].dt.month.astype("Int8")
+            df["Periodo Resolucion"] = self._month_start(df["Hora de resolucion"])
         return df
     
+    @staticmethod
+    def _month_start(timestamps: pd.Series) -> pd.Series:
+        """Floor timestamps to month start with numpy datetime64 truncation (NaT stays NaT)."""
+        month_starts = timestamps.to_numpy("datetime64[ns]").astype("datetime64[M]").astype("datetime64[ns]")
+        return pd.Series(month_starts, index=timestamps.index)
+    
     def _add_composite_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add composite/derived columns."""
         if "Responsable Tk" in df.columns and "Agente" in df.columns:
@@ -78,3 +106,14 @@ class DataPreprocessor:
                 df["Agente"],
             )
         return df
+    
+    def _add_status_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Flag resolved tickets and group Estado once so renderers read columns instead of re-normalizing states."""
+        status_helper = TicketStatusHelper(self.config)
+        if "Estado" in df.columns:
+            df[self.config.ESTADO_GROUPED_COLUMN] = (
+                status_helper.normalize_estado_for_display(df["Estado"]).astype("category")
+            )
+        if "Estado de resolucion" in df.columns:
+            df[self.config.RESOLVED_FLAG_COLUMN] = status_helper.build_resolved_mask(df)
+        return df
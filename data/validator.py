@@ -15,7 +15,6 @@ class DataValidator:
     
     def validate_and_standardize(self, df: pd.DataFrame) -> pd.DataFrame:
         """Standardize column names and warn if core columns are missing."""
-        df = df.copy()
         df = df.replace(r"^\s*$", pd.NA, regex=True)
         df = df.dropna(axis=1, how="all")
         
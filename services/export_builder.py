@@ -6,13 +6,29 @@ import copy
 from functools import lru_cache
 import hashlib
 from io import BytesIO
+import logging
+import math
+import numbers
 import re
 import threading
-from typing import Any, List, Optional, Tuple
+import weakref
+from typing import Any, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.io as pio
 
+from utils import format_numeric_display_table
+
+logger = logging.getLogger(__name__)
+
+_PERCENT_RE = re.compile(r"-?\d+(?:[\.,]\d+)?%")
+_THOUSANDS_RE = re.compile(r"-?\d{1,3}(?:\.\d{3})+")
+_INT_RE = re.compile(r"-?\d+")
+_DECIMAL_RE = re.compile(r"-?\d+[\.,]\d+")
+_WS_RE = re.compile(r"\s+")
+_ACCENT_TRANS = str.maketrans("áéíóú", "aeiou")
+
 
 class ExportBuilder:
     """Builds export files (Excel and PDF) from dashboard tables."""
@@ -20,6 +36,8 @@ class ExportBuilder:
     _warmup_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
     _warmup_lock = threading.Lock()
     _warmup_jobs: dict[str, concurrent.futures.Future] = {}
+    _figure_json_cache: dict[int, str] = {}
+    _kaleido_server_started = False
 
     @staticmethod
     def warm_chart_cache_async(charts: Optional[List[Tuple[str, Any]]]) -> None:
@@ -48,101 +66,163 @@ class ExportBuilder:
                 )
                 ExportBuilder._warmup_jobs[cache_key] = future
 
+    @staticmethod
+    def _prerender_table_charts(
+        tables: List[Tuple[str, pd.DataFrame]],
+        chart_entries: List[Tuple[str, Any]],
+        chart_keys: List[str],
+    ) -> None:
+        """Render the charts an export will embed concurrently, before the layout loop reads them."""
+        planned_indexes: set[int] = set()
+        for name, table in tables:
+            if table is None or table.empty:
+                continue
+            chart_idx = ExportBuilder._pick_chart_index(name, chart_entries, chart_keys, planned_indexes)
+            if chart_idx is not None:
+                planned_indexes.add(chart_idx)
+        if not planned_indexes:
+            return
+
+        planned_charts = [chart_entries[idx] for idx in sorted(planned_indexes)]
+        ExportBuilder.warm_chart_cache_async(planned_charts)
+        job_keys = [
+            ExportBuilder._hash_text(fig_json)
+            for fig_json in (ExportBuilder._figure_to_json(chart_fig) for _, chart_fig in planned_charts)
+            if fig_json is not None
+        ]
+        with ExportBuilder._warmup_lock:
+            pending = [ExportBuilder._warmup_jobs.get(key) for key in job_keys]
+        concurrent.futures.wait([future for future in pending if future is not None])
+
+    @staticmethod
+    def _ensure_kaleido_server() -> None:
+        """Keep one Kaleido browser alive across renders instead of launching one per figure."""
+        if ExportBuilder._kaleido_server_started:
+            return
+        with ExportBuilder._warmup_lock:
+            if ExportBuilder._kaleido_server_started:
+                return
+            try:
+                import kaleido
+
+                start_sync_server = kaleido.start_sync_server
+            except (ImportError, AttributeError):
+                # Kaleido builds without a sync server keep rendering one browser per call.
+                return
+            try:
+                start_sync_server(silence_warnings=True)
+            except Exception:
+                logger.exception("Could not start the Kaleido sync server; charts render per call")
+                return
+            ExportBuilder._kaleido_server_started = True
+
     @staticmethod
     def build_excel_bytes(
         tables: List[Tuple[str, pd.DataFrame]],
         charts: Optional[List[Tuple[str, Any]]] = None,
     ) -> bytes:
         """Build an Excel file in a single sheet with vertical table/chart blocks."""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.drawing.image import Image as XLImage
+        from openpyxl.utils import get_column_letter
 
         output = BytesIO()
         chart_entries = list(charts or [])
+        chart_keys = [ExportBuilder._normalized_name(chart_name) for chart_name, _ in chart_entries]
         consumed_chart_indexes: set[int] = set()
+        ExportBuilder._prerender_table_charts(tables, chart_entries, chart_keys)
 
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            used_names = set()
-            sheet_name = ExportBuilder._safe_sheet_name("Resumen KPI", used_names)
-            used_names.add(sheet_name)
-            current_start_row = 0
-
-            for raw_name, table in tables:
-                if table is None or table.empty:
-                    continue
+        workbook = Workbook(write_only=True)
+        ws = workbook.create_sheet(ExportBuilder._safe_sheet_name("Resumen KPI", set()))
+        # Write-only sheets only append rows in order, so cells are laid out first and streamed once.
+        sheet_rows: dict[int, dict[int, Any]] = {}
+        current_start_row = 1
 
-                export_table = table.reset_index().copy()
-                section_title = pd.DataFrame([[raw_name]])
-                section_title.to_excel(
-                    writer,
-                    sheet_name=sheet_name,
-                    startrow=current_start_row,
-                    startcol=0,
-                    index=False,
-                    header=False,
-                )
+        for raw_name, table in tables:
+            if table is None or table.empty:
+                continue
 
-                table_start_row = current_start_row + 1
-                export_table.to_excel(
-                    writer,
-                    sheet_name=sheet_name,
-                    startrow=table_start_row,
-                    startcol=0,
-                    index=False,
-                )
+            export_table = table.reset_index()
+            sheet_rows.setdefault(current_start_row, {})[1] = raw_name
 
-                ws = writer.book[sheet_name]
-                header_row = table_start_row + 1
-                data_start_row = header_row + 1
-                data_end_row = table_start_row + len(export_table) + 1
-                start_col = 1
-                end_col = export_table.shape[1]
-                ExportBuilder._coerce_table_cell_types(
-                    ws,
-                    data_start_row=data_start_row,
-                    data_end_row=data_end_row,
-                    start_col=start_col,
-                    end_col=end_col,
-                )
-                ExportBuilder._autofit_columns(
-                    ws,
-                    start_col=start_col,
-                    end_col=end_col,
-                    header_row=header_row,
-                    data_start_row=data_start_row,
-                    data_end_row=data_end_row,
-                )
+            header = export_table.columns.tolist()
+            header_row = current_start_row + 1
+            header_cells = sheet_rows.setdefault(header_row, {})
+            for col_idx, value in enumerate(header, start=1):
+                header_cells[col_idx] = ExportBuilder._excel_header_cell(ws, WriteOnlyCell, value)
+
+            value_rows, format_rows, content_lengths = ExportBuilder._coerce_table_cell_types(export_table)
+            for row_offset, (values, number_formats) in enumerate(zip(value_rows, format_rows), start=1):
+                row_cells = sheet_rows.setdefault(header_row + row_offset, {})
+                for col_idx, (value, number_format) in enumerate(zip(values, number_formats), start=1):
+                    if number_format:
+                        cell = WriteOnlyCell(ws, value=value)
+                        cell.number_format = number_format
+                        value = cell
+                    row_cells[col_idx] = value
+
+            for col_idx, width in enumerate(ExportBuilder._autofit_widths(header, content_lengths), start=1):
+                ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+            data_end_row = header_row + len(value_rows)
+            chart_idx = ExportBuilder._pick_chart_index(
+                raw_name, chart_entries, chart_keys, consumed_chart_indexes
+            )
+            if chart_idx is None:
+                current_start_row = data_end_row + 3
+                continue
 
-                chart_idx = ExportBuilder._pick_chart_index(raw_name, chart_entries, consumed_chart_indexes)
-                if chart_idx is None:
-                    current_start_row = data_end_row + 2
-                    continue
+            chart_name, chart_fig = chart_entries[chart_idx]
+            consumed_chart_indexes.add(chart_idx)
+            start_row = data_end_row + 2
+            sheet_rows.setdefault(start_row, {})[1] = f"Gráfico: {chart_name}"
+
+            image_bytes = ExportBuilder._figure_to_png_bytes(chart_fig)
+            if image_bytes is not None:
+                img_stream = BytesIO(image_bytes)
+                image = XLImage(img_stream)
+                image.width = 1100
+                image.height = 400
+                ws.add_image(image, f"A{start_row + 1}")
+                current_start_row = start_row + 25
+                continue
 
-                chart_name, chart_fig = chart_entries[chart_idx]
-                consumed_chart_indexes.add(chart_idx)
-                start_row = data_end_row + 2
-                ws[f"A{start_row}"] = f"Gráfico: {chart_name}"
-
-                image_bytes = ExportBuilder._figure_to_png_bytes(chart_fig)
-                if image_bytes is not None:
-                    img_stream = BytesIO(image_bytes)
-                    image = XLImage(img_stream)
-                    image.width = 1100
-                    image.height = 400
-                    ws.add_image(image, f"A{start_row + 1}")
-                    current_start_row = start_row + 24
-                    continue
+            native_ok = ExportBuilder._add_native_excel_chart(ws, sheet_rows, chart_fig, start_row + 1)
+            if not native_ok:
+                sheet_rows.setdefault(start_row + 1, {})[1] = "No se pudo generar este gráfico en Excel."
+                current_start_row = start_row + 4
+                continue
 
-                native_ok = ExportBuilder._add_native_excel_chart(ws, chart_fig, start_row + 1)
-                if not native_ok:
-                    ws[f"A{start_row + 1}"] = "No se pudo generar este gráfico en Excel."
-                    current_start_row = start_row + 3
-                    continue
+            current_start_row = start_row + 21
 
-                current_start_row = start_row + 20
+        last_row = max(sheet_rows, default=0)
+        for row_number in range(1, last_row + 1):
+            row_cells = sheet_rows.get(row_number)
+            if not row_cells:
+                ws.append([])
+                continue
+            row_values = [None] * max(row_cells)
+            for col_idx, value in row_cells.items():
+                row_values[col_idx - 1] = value
+            ws.append(row_values)
 
+        workbook.save(output)
         output.seek(0)
         return output.getvalue()
 
+    @staticmethod
+    def _excel_header_cell(ws: Any, cell_type: Any, value: Any) -> Any:
+        """Build a header cell styled like pandas' to_excel header (bold, thin border)."""
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        thin = Side(style="thin")
+        cell = cell_type(ws, value=value)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        return cell
+
     @staticmethod
     def build_pdf_bytes(
         tables: List[Tuple[str, pd.DataFrame]],
@@ -158,6 +238,7 @@ class ExportBuilder:
         from reportlab.platypus import Image as RLImage
         from reportlab.platypus import (
             CondPageBreak,
+            LongTable,
             Paragraph,
             SimpleDocTemplate,
             Spacer,
@@ -176,7 +257,9 @@ class ExportBuilder:
         )
         styles = getSampleStyleSheet()
         chart_entries = list(charts or [])
+        chart_keys = [ExportBuilder._normalized_name(chart_name) for chart_name, _ in chart_entries]
         consumed_chart_indexes: set[int] = set()
+        ExportBuilder._prerender_table_charts(tables, chart_entries, chart_keys)
         page_width = landscape(A4)[0] - (20 * mm)
         story = [
             Paragraph(title, styles["Title"]),
@@ -191,15 +274,15 @@ class ExportBuilder:
             story.append(CondPageBreak(28 * mm))
             section_story = [Paragraph(name, styles["Heading3"])]
 
-            export_table = table.reset_index().copy()
-            export_table = export_table.fillna("").astype(str)
+            export_table = format_numeric_display_table(table, coerce_numeric=False).reset_index()
             header = export_table.columns.tolist()
-            rows = export_table.values.tolist()
-            matrix = [header] + rows
+            matrix = [header, *ExportBuilder._pdf_text_rows(export_table)]
 
-            col_widths = ExportBuilder._build_pdf_column_widths(header, rows, page_width)
+            col_widths = ExportBuilder._build_pdf_column_widths(export_table, page_width)
 
-            pdf_table = Table(matrix, repeatRows=1, colWidths=col_widths)
+            # LongTable splits long tables across pages without re-measuring every row per page.
+            table_class = LongTable if len(matrix) > 200 else Table
+            pdf_table = table_class(matrix, repeatRows=1, colWidths=col_widths)
             pdf_table.setStyle(
                 TableStyle(
                     [
@@ -215,7 +298,7 @@ class ExportBuilder:
             section_story.append(Spacer(1, 1.5 * mm))
             section_story.append(pdf_table)
 
-            chart_idx = ExportBuilder._pick_chart_index(name, chart_entries, consumed_chart_indexes)
+            chart_idx = ExportBuilder._pick_chart_index(name, chart_entries, chart_keys, consumed_chart_indexes)
             has_chart = chart_idx is not None
             chart_height_pt = 0.0
             if chart_idx is not None:
@@ -273,6 +356,7 @@ class ExportBuilder:
                 pass
         try:
             export_fig, width_px, height_px = ExportBuilder._prepare_figure_for_export(fig)
+            ExportBuilder._ensure_kaleido_server()
             return export_fig.to_image(format="png", width=width_px, height=height_px, scale=1)
         except Exception:
             return None
@@ -291,10 +375,15 @@ class ExportBuilder:
                 pass
         try:
             export_fig, width_px, height_px = ExportBuilder._prepare_figure_for_export(fig)
+            ExportBuilder._ensure_kaleido_server()
             png_bytes = export_fig.to_image(format="png", width=width_px, height=height_px, scale=1)
         except Exception:
             return None
+        return ExportBuilder._png_to_pdf_jpeg(png_bytes)
 
+    @staticmethod
+    def _png_to_pdf_jpeg(png_bytes: bytes) -> bytes:
+        """Re-encode a chart PNG as a single-pass JPEG for the PDF (PNG kept if Pillow fails)."""
         try:
             from PIL import Image
 
@@ -302,8 +391,7 @@ class ExportBuilder:
                 if image.mode in ("RGBA", "P"):
                     image = image.convert("RGB")
                 optimized = BytesIO()
-                image.save(optimized, format="JPEG", quality=70, optimize=True)
-                optimized.seek(0)
+                image.save(optimized, format="JPEG", quality=70)
                 return optimized.getvalue()
         except Exception:
             return png_bytes
@@ -312,15 +400,16 @@ class ExportBuilder:
     def _pick_chart_index(
         table_name: str,
         charts: List[Tuple[str, Any]],
+        chart_keys: List[str],
         consumed_indexes: set[int],
     ) -> Optional[int]:
-        """Pick chart index using strict deterministic name matching."""
+        """Pick chart index using strict deterministic name matching against pre-normalized chart names."""
         normalized_table = ExportBuilder._normalized_name(table_name)
 
-        for idx, (chart_name, chart_fig) in enumerate(charts):
+        for idx, ((_, chart_fig), chart_key) in enumerate(zip(charts, chart_keys)):
             if idx in consumed_indexes or chart_fig is None:
                 continue
-            if ExportBuilder._normalized_name(chart_name) == normalized_table:
+            if chart_key == normalized_table:
                 return idx
 
         return None
@@ -328,57 +417,52 @@ class ExportBuilder:
     @staticmethod
     def _normalized_name(name: str) -> str:
         """Normalize a name for strict and deterministic matching."""
-        normalized = str(name).lower().strip()
-        replacements = {
-            "á": "a",
-            "é": "e",
-            "í": "i",
-            "ó": "o",
-            "ú": "u",
-        }
-        for source, target in replacements.items():
-            normalized = normalized.replace(source, target)
-        normalized = re.sub(r"\s+", " ", normalized)
-        return normalized
+        return _WS_RE.sub(" ", str(name).lower().strip().translate(_ACCENT_TRANS))
 
     @staticmethod
-    def _build_pdf_column_widths(
-        header: List[Any],
-        rows: List[List[Any]],
-        total_width: float,
-    ) -> List[float]:
+    def _pdf_text_rows(export_table: pd.DataFrame) -> Iterator[List[str]]:
+        """Yield table rows as display strings, rendering missing cells as blanks."""
+        for row in export_table.itertuples(index=False, name=None):
+            yield [
+                ""
+                if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and value != value)
+                else str(value)
+                for value in row
+            ]
+
+    @staticmethod
+    def _build_pdf_column_widths(export_table: pd.DataFrame, total_width: float) -> List[float]:
         """Build column widths proportionally to content, constrained to page width."""
+        header = export_table.columns.tolist()
         col_count = max(len(header), 1)
         if col_count == 1:
             return [total_width]
 
-        sample_rows = rows[:300]
-        weights: List[float] = []
-        for col_idx in range(col_count):
-            header_len = len(str(header[col_idx])) if col_idx < len(header) else 0
-            max_len = header_len
-            for row in sample_rows:
-                if col_idx >= len(row):
-                    continue
-                text = "" if row[col_idx] is None else str(row[col_idx]).replace("\n", " ")
-                max_len = max(max_len, min(len(text), 60))
-            weights.append(float(max(max_len, 6)))
+        sample = export_table.head(300)
+        content_lengths = np.array(
+            [
+                sample.iloc[:, position].astype(str).str.len().clip(upper=60).max() if len(sample) else 0
+                for position in range(col_count)
+            ],
+            dtype=float,
+        )
+        header_lengths = np.array([len(str(value)) for value in header], dtype=float)
+        weights = np.maximum(np.maximum(header_lengths, content_lengths), 6.0)
 
-        total_weight = sum(weights)
+        total_weight = weights.sum()
         if total_weight <= 0:
             return [total_width / col_count] * col_count
 
         min_width = 35.0
         max_width = 200.0
-        scaled = [total_width * (weight / total_weight) for weight in weights]
-        bounded = [min(max(width, min_width), max_width) for width in scaled]
+        bounded = np.clip(total_width * (weights / total_weight), min_width, max_width)
 
-        bounded_sum = sum(bounded)
+        bounded_sum = bounded.sum()
         if bounded_sum <= 0:
             return [total_width / col_count] * col_count
 
         factor = total_width / bounded_sum
-        return [width * factor for width in bounded]
+        return (bounded * factor).tolist()
 
     @staticmethod
     def _estimate_pdf_section_height(row_count: int, chart_height_pt: float = 0) -> float:
@@ -403,6 +487,22 @@ class ExportBuilder:
             count += 1
         return count
 
+    @staticmethod
+    def _decimate_traces(fig: Any, max_points: int = 1200) -> None:
+        """Stride-sample traces longer than max_points in place (only on export copies)."""
+        for trace in getattr(fig, "data", []):
+            y_values = getattr(trace, "y", None)
+            if y_values is None or len(y_values) <= max_points:
+                continue
+            point_count = len(y_values)
+            step = math.ceil(point_count / max_points)
+            updates = {}
+            for attribute in ("x", "y", "text", "customdata", "hovertext"):
+                values = getattr(trace, attribute, None)
+                if values is not None and not isinstance(values, str) and len(values) == point_count:
+                    updates[attribute] = values[::step]
+            trace.update(updates)
+
     @staticmethod
     def _prepare_figure_for_export(fig: Any) -> Tuple[Any, int, int]:
         """Prepare a figure copy with export-friendly layout so legends are fully visible."""
@@ -412,6 +512,7 @@ class ExportBuilder:
         width_px = 1350
 
         export_fig = copy.deepcopy(fig)
+        ExportBuilder._decimate_traces(export_fig)
         export_fig.update_layout(
             autosize=False,
             width=width_px,
@@ -431,13 +532,23 @@ class ExportBuilder:
 
     @staticmethod
     def _figure_to_json(fig: Any) -> Optional[str]:
-        """Serialize a chart to JSON for deterministic export-image caching."""
+        """Serialize a chart to JSON once per live figure for deterministic export-image caching."""
         if fig is None:
             return None
+        fig_id = id(fig)
+        cached_json = ExportBuilder._figure_json_cache.get(fig_id)
+        if cached_json is not None:
+            return cached_json
         try:
-            return fig.to_json()
+            fig_json = fig.to_json()
         except Exception:
             return None
+        try:
+            weakref.finalize(fig, ExportBuilder._figure_json_cache.pop, fig_id, None)
+        except TypeError:
+            return fig_json
+        ExportBuilder._figure_json_cache[fig_id] = fig_json
+        return fig_json
 
     @staticmethod
     @lru_cache(maxsize=256)
@@ -445,6 +556,7 @@ class ExportBuilder:
         """Build and cache PNG/JPEG chart images from a serialized Plotly figure."""
         try:
             fig = pio.from_json(fig_json)
+            ExportBuilder._decimate_traces(fig)
             legend_items = ExportBuilder._count_legend_items(fig)
             extra_height = max(0, legend_items - 7) * 36
             height_px = min(1100, 520 + extra_height)
@@ -465,22 +577,11 @@ class ExportBuilder:
                     tracegroupgap=4,
                 ),
             )
+            ExportBuilder._ensure_kaleido_server()
             png_bytes = fig.to_image(format="png", width=width_px, height=height_px, scale=1)
         except Exception:
             return None, None
-
-        try:
-            from PIL import Image
-
-            with Image.open(BytesIO(png_bytes)) as image:
-                if image.mode in ("RGBA", "P"):
-                    image = image.convert("RGB")
-                optimized = BytesIO()
-                image.save(optimized, format="JPEG", quality=70, optimize=True)
-                optimized.seek(0)
-                return png_bytes, optimized.getvalue()
-        except Exception:
-            return png_bytes, png_bytes
+        return png_bytes, ExportBuilder._png_to_pdf_jpeg(png_bytes)
 
     @staticmethod
     def _hash_text(content: str) -> str:
@@ -497,16 +598,7 @@ class ExportBuilder:
     @staticmethod
     def _name_tokens(name: str) -> set[str]:
         """Extract normalized tokens from a table or chart name."""
-        normalized = str(name).lower()
-        replacements = {
-            "á": "a",
-            "é": "e",
-            "í": "i",
-            "ó": "o",
-            "ú": "u",
-        }
-        for source, target in replacements.items():
-            normalized = normalized.replace(source, target)
+        normalized = str(name).lower().translate(_ACCENT_TRANS)
 
         parts = [part.strip() for part in normalized.replace("(", " ").replace(")", " ").split("-")]
         words = set()
@@ -517,8 +609,13 @@ class ExportBuilder:
         return words
 
     @staticmethod
-    def _add_native_excel_chart(ws: Any, fig: Any, start_row: int) -> bool:
-        """Create an Excel-native line chart from Plotly data as fallback."""
+    def _add_native_excel_chart(
+        ws: Any,
+        sheet_rows: dict[int, dict[int, Any]],
+        fig: Any,
+        start_row: int,
+    ) -> bool:
+        """Create an Excel-native line chart from Plotly data as fallback (source cells go to sheet_rows)."""
         try:
             from openpyxl.chart import LineChart, Reference
             from openpyxl.utils import get_column_letter
@@ -543,15 +640,16 @@ class ExportBuilder:
         source_end_col = source_start_col + len(traces)
 
         max_len = max(len(y_values) for _, _, y_values in traces)
-        ws.cell(row=start_row, column=source_start_col, value="Periodo")
+        header_cells = sheet_rows.setdefault(start_row, {})
+        header_cells[source_start_col] = "Periodo"
         for col_idx, (name, _, _) in enumerate(traces, start=source_start_col + 1):
-            ws.cell(row=start_row, column=col_idx, value=str(name))
+            header_cells[col_idx] = str(name)
 
         base_x = traces[0][1]
         for row_offset in range(max_len):
-            row_number = start_row + 1 + row_offset
+            row_cells = sheet_rows.setdefault(start_row + 1 + row_offset, {})
             x_value = base_x[row_offset] if row_offset < len(base_x) else ""
-            ws.cell(row=row_number, column=source_start_col, value=str(x_value))
+            row_cells[source_start_col] = str(x_value)
 
             for col_idx, (_, _, y_values) in enumerate(traces, start=source_start_col + 1):
                 value = y_values[row_offset] if row_offset < len(y_values) else None
@@ -559,7 +657,7 @@ class ExportBuilder:
                     numeric_value = float(value) if value is not None else None
                 except (TypeError, ValueError):
                     numeric_value = None
-                ws.cell(row=row_number, column=col_idx, value=numeric_value)
+                row_cells[col_idx] = numeric_value
 
         for hidden_col in range(source_start_col, source_end_col + 1):
             ws.column_dimensions[get_column_letter(hidden_col)].hidden = True
@@ -589,38 +687,58 @@ class ExportBuilder:
 
     @staticmethod
     def _coerce_table_cell_types(
-        ws: Any,
-        data_start_row: int,
-        data_end_row: int,
-        start_col: int,
-        end_col: int,
-    ) -> None:
-        """Convert text-like numeric cells into Excel numeric types and formats."""
-        for row in ws.iter_rows(
-            min_row=data_start_row,
-            max_row=data_end_row,
-            min_col=start_col,
-            max_col=end_col,
-        ):
-            for cell in row:
-                if not isinstance(cell.value, str):
-                    continue
-                parsed = ExportBuilder._parse_numeric_text(cell.value)
-                if parsed is None:
-                    continue
-                value, number_format = parsed
-                cell.value = value
-                if number_format:
-                    cell.number_format = number_format
+        export_table: pd.DataFrame,
+    ) -> Tuple[List[List[Any]], List[List[Optional[str]]], List[int]]:
+        """Convert table cells to Excel values, number formats and per-column text length."""
+        coerced_columns = [ExportBuilder._coerce_column_cells(column) for _, column in export_table.items()]
+        value_rows = [list(values) for values in zip(*(values for values, _, _ in coerced_columns))]
+        format_rows = [list(formats) for formats in zip(*(formats for _, formats, _ in coerced_columns))]
+        content_lengths = [content_length for _, _, content_length in coerced_columns]
+        return value_rows, format_rows, content_lengths
+
+    @staticmethod
+    def _coerce_column_cells(column: pd.Series) -> Tuple[List[Any], List[Optional[str]], int]:
+        """Round numeric columns in bulk; parse each distinct value of other columns once."""
+        if pd.api.types.is_numeric_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype):
+            rounded = column.round().astype("Int64")
+            values = rounded.to_numpy(dtype=object, na_value=None).tolist()
+            formats = [None if value is None else "#,##0" for value in values]
+            # Formatted integer length grows with magnitude, so the extremes bound the column.
+            content_length = 0
+            if rounded.notna().any():
+                content_length = max(
+                    ExportBuilder._cell_text_length(int(rounded.min())),
+                    ExportBuilder._cell_text_length(int(rounded.max())),
+                )
+            return values, formats, content_length
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        coerced = [ExportBuilder._coerce_cell_value(value) for value in uniques]
+        content_length = max((ExportBuilder._cell_text_length(value) for value, _ in coerced), default=0)
+        return [coerced[code][0] for code in codes], [coerced[code][1] for code in codes], content_length
+
+    @staticmethod
+    def _coerce_cell_value(value: Any) -> Tuple[Any, Optional[str]]:
+        """Return the Excel value and number format for one table cell."""
+        if isinstance(value, numbers.Real) and not isinstance(value, bool):
+            if math.isnan(value):
+                return None, None
+            return int(round(value)), "#,##0"
+        if isinstance(value, str):
+            parsed = ExportBuilder._parse_numeric_text(value)
+            return parsed if parsed is not None else (value, None)
+        if value is None or value is pd.NA or value is pd.NaT:
+            return None, None
+        return value, None
 
     @staticmethod
     def _parse_numeric_text(value: str) -> Optional[Tuple[float | int, str]]:
         """Parse string values to int/float/percent preserving expected formatting."""
         text = str(value).strip()
-        if not text:
+        # Labels are the common case; every numeric pattern starts with a digit or a minus sign.
+        if not text or not (text[0].isdigit() or text[0] == "-"):
             return None
 
-        percent_match = re.fullmatch(r"-?\d+(?:[\.,]\d+)?%", text)
+        percent_match = _PERCENT_RE.fullmatch(text)
         if percent_match:
             numeric_text = text[:-1].replace(".", "").replace(",", ".")
             try:
@@ -629,19 +747,19 @@ class ExportBuilder:
             except ValueError:
                 return None
 
-        if re.fullmatch(r"-?\d{1,3}(?:\.\d{3})+", text):
+        if _THOUSANDS_RE.fullmatch(text):
             try:
                 return int(text.replace(".", "")), "#,##0"
             except ValueError:
                 return None
 
-        if re.fullmatch(r"-?\d+", text):
+        if _INT_RE.fullmatch(text):
             try:
                 return int(text), "#,##0"
             except ValueError:
                 return None
 
-        if re.fullmatch(r"-?\d+[\.,]\d+", text):
+        if _DECIMAL_RE.fullmatch(text):
             normalized = text.replace(",", ".")
             try:
                 decimals = len(normalized.split(".")[-1])
@@ -653,32 +771,20 @@ class ExportBuilder:
         return None
 
     @staticmethod
-    def _autofit_columns(
-        ws: Any,
-        start_col: int,
-        end_col: int,
-        header_row: int,
-        data_start_row: int,
-        data_end_row: int,
-    ) -> None:
-        """Set column widths based on content length for header and table rows."""
-        from openpyxl.utils import get_column_letter
+    def _autofit_widths(header: List[Any], content_lengths: List[int]) -> List[float]:
+        """Return column widths from header text and the longest cell of each column."""
+        widths: List[float] = []
+        for header_value, content_length in zip(header, content_lengths):
+            max_length = len(str(header_value)) if header_value is not None else 0
+            max_length = max(max_length, content_length)
+            widths.append(min(max(max_length + 2, 10), 40))
+        return widths
 
-        for col_idx in range(start_col, end_col + 1):
-            max_length = 0
-            header_value = ws.cell(row=header_row, column=col_idx).value
-            if header_value is not None:
-                max_length = max(max_length, len(str(header_value)))
-
-            for row_idx in range(data_start_row, data_end_row + 1):
-                cell_value = ws.cell(row=row_idx, column=col_idx).value
-                if cell_value is None:
-                    continue
-                if isinstance(cell_value, (int, float)):
-                    text_len = len(f"{cell_value:,.2f}")
-                else:
-                    text_len = len(str(cell_value))
-                max_length = max(max_length, text_len)
-
-            col_letter = get_column_letter(col_idx)
-            ws.column_dimensions[col_letter].width = min(max(max_length + 2, 10), 40)
+    @staticmethod
+    def _cell_text_length(value: Any) -> int:
+        """Return the display length used for autofit (numbers measured with separators)."""
+        if value is None:
+            return 0
+        if isinstance(value, (int, float)):
+            return len(f"{value:,.2f}")
+        return len(str(value))
@@ -1,15 +1,21 @@
 """Estado y firma de exportaciones para el dashboard."""
 import hashlib
-from typing import Dict, List, Optional, Tuple
+import weakref
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from utils import TextNormalizer
 
+from .export_builder import ExportBuilder
+
 
 class ExportStateManager:
     """Gestiona cache, firmas y metadatos de exportación."""
 
+    _table_hash_cache: Dict[int, str] = {}
+
     @staticmethod
     def build_filter_labels(
         selected_year: Optional[int],
@@ -38,6 +44,8 @@ class ExportStateManager:
         """Ensure required export cache keys exist."""
         cache.setdefault("busy", False)
         cache.setdefault("pending_action", None)
+        cache.setdefault("future", None)
+        cache.setdefault("future_signature", None)
 
     @staticmethod
     def build_signatures(
@@ -73,9 +81,24 @@ class ExportStateManager:
 
     @staticmethod
     def _hash_table(table: pd.DataFrame) -> str:
+        """Return memoized content hash for a dataframe still alive in memory."""
+        table_id = id(table)
+        cached_hash = ExportStateManager._table_hash_cache.get(table_id)
+        if cached_hash is not None:
+            return cached_hash
+
+        table_hash = ExportStateManager._compute_table_hash(table)
+        try:
+            weakref.finalize(table, ExportStateManager._table_hash_cache.pop, table_id, None)
+        except TypeError:
+            return table_hash
+        ExportStateManager._table_hash_cache[table_id] = table_hash
+        return table_hash
+
+    @staticmethod
+    def _compute_table_hash(table: pd.DataFrame) -> str:
         """Build deterministic hash for a dataframe content/shape/order."""
         try:
-            row_hashes = pd.util.hash_pandas_object(table, index=True).values.tobytes()
             metadata = "|".join(
                 [
                     ";".join(str(col) for col in table.columns.tolist()),
@@ -83,24 +106,36 @@ class ExportStateManager:
                     str(table.shape),
                 ]
             )
-            digest = hashlib.sha1()
+            digest = hashlib.blake2b(digest_size=8)
             digest.update(metadata.encode("utf-8"))
-            digest.update(row_hashes)
-            return digest.hexdigest()[:16]
+            digest.update(ExportStateManager._values_to_bytes(table.index))
+            for position in range(table.shape[1]):
+                digest.update(ExportStateManager._values_to_bytes(table.iloc[:, position]))
+            return digest.hexdigest()
         except Exception:
             fallback = f"{table.shape[0]}|{table.shape[1]}"
             return hashlib.sha1(fallback.encode("utf-8")).hexdigest()[:16]
 
+    @staticmethod
+    def _values_to_bytes(values: Union[pd.Series, pd.Index]) -> bytes:
+        """Return a column's raw buffer (codes for categoricals, per-value hashes for objects)."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categorical = values.array
+            return categorical.codes.tobytes() + ExportStateManager._values_to_bytes(categorical.categories)
+        array = values.to_numpy()
+        if array.dtype.kind in "biufcmM":
+            return np.ascontiguousarray(array).tobytes()
+        return pd.util.hash_array(array.astype(object, copy=False)).tobytes()
+
     @staticmethod
     def _hash_chart(chart_fig: object) -> str:
         """Build deterministic hash for plotly chart payload."""
         if chart_fig is None:
             return "none"
-        try:
-            chart_json = chart_fig.to_json()
-            return hashlib.sha1(chart_json.encode("utf-8")).hexdigest()[:16]
-        except Exception:
+        chart_json = ExportBuilder._figure_to_json(chart_fig)
+        if chart_json is None:
             return "invalid"
+        return hashlib.sha1(chart_json.encode("utf-8")).hexdigest()[:16]
 
     @staticmethod
     def reset_cache_if_signature_changed(
@@ -108,14 +143,14 @@ class ExportStateManager:
         excel_signature: str,
         pdf_signature: str,
     ) -> None:
-        """Invalidate cached bytes when signatures changed."""
+        """Invalidate prepared files when signatures changed."""
         if cache.get("excel_signature") != excel_signature:
             cache["excel_signature"] = excel_signature
-            cache["excel_bytes"] = None
+            cache["excel_ready"] = False
 
         if cache.get("pdf_signature") != pdf_signature:
             cache["pdf_signature"] = pdf_signature
-            cache["pdf_bytes"] = None
+            cache["pdf_ready"] = False
 
     @staticmethod
     def build_filename_base(
@@ -134,7 +169,7 @@ class ExportStateManager:
     def is_excel_ready(cache: Dict, excel_signature: str) -> bool:
         """Return True when excel file is already prepared and valid."""
         return (
-            cache.get("excel_bytes") is not None
+            bool(cache.get("excel_ready"))
             and cache.get("excel_signature") == excel_signature
         )
 
@@ -142,6 +177,6 @@ class ExportStateManager:
     def is_pdf_ready(cache: Dict, pdf_signature: str) -> bool:
         """Return True when pdf file is already prepared and valid."""
         return (
-            cache.get("pdf_bytes") is not None
+            bool(cache.get("pdf_ready"))
             and cache.get("pdf_signature") == pdf_signature
         )
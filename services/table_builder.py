@@ -1,4 +1,5 @@
 """Table building functionality."""
+import numpy as np
 import pandas as pd
 
 from config import AppConfig
@@ -31,26 +32,32 @@ class TableBuilder:
         self, df: pd.DataFrame, index_col: str, fill_missing: str = "Sin valor"
     ) -> pd.DataFrame:
         """Build a generic pivot table by month."""
-        df = df.copy()
-        df[index_col] = df[index_col].fillna(fill_missing)
+        row_labels = self.fill_missing_labels(df[index_col], fill_missing)
         
         month_order = list(range(1, 13))
         pivot = (
-            df.pivot_table(
-                index=index_col,
-                columns="Mes",
-                values="ID del ticket",
-                aggfunc="nunique",
-                fill_value=0,
-            ).sort_index()
+            df.groupby([row_labels, df["Mes"]], observed=True)["ID del ticket"]
+            .nunique()
+            .unstack("Mes", fill_value=0)
         )
+        if isinstance(pivot.index, pd.CategoricalIndex):
+            pivot.index = pivot.index.astype(object)
+        pivot = pivot.sort_index()
         
         pivot = pivot.reindex(columns=month_order, fill_value=0)
-        pivot.columns = [self.config.MONTH_NAMES_ES.get(m, str(m)) for m in pivot.columns]
+        pivot = pivot.rename(columns=self.config.MONTH_NAMES_ES)
         pivot["Total"] = pivot.sum(axis=1)
         pivot.loc["Total"] = pivot.sum(axis=0)
         
-        return pivot
+        # Ticket counts fit in int32; halves the cached pivots' footprint.
+        return pivot.astype(np.int32, copy=False)
+    
+    @staticmethod
+    def fill_missing_labels(series: pd.Series, fill_missing: str) -> pd.Series:
+        """Fill missing labels, registering the placeholder when the series is categorical."""
+        if isinstance(series.dtype, pd.CategoricalDtype) and fill_missing not in series.cat.categories:
+            series = series.cat.add_categories([fill_missing])
+        return series.fillna(fill_missing)
     
     def add_sla_percentage_row(self, pivot: pd.DataFrame) -> pd.DataFrame:
         """Add SLA violated percentage row to resolution table."""
@@ -78,19 +85,15 @@ class TableBuilder:
             within_row = pd.Series({col: 0 for col in month_cols})
 
         # % Fuera de SLA = Incumplido / (Cumplido + Incumplido)
-        denominator_row = within_row[month_cols] + violated_row[month_cols]
-        percent_row = violated_row[month_cols] / denominator_row.replace(0, pd.NA)
+        violated = violated_row[month_cols].to_numpy(dtype=float)
+        within = within_row[month_cols].to_numpy(dtype=float)
+        denominator = within + violated
+        percent_row = np.divide(violated, denominator, out=np.zeros_like(violated), where=denominator > 0)
 
-        total_within = within_row[month_cols].sum()
-        total_violated = violated_row[month_cols].sum()
-        total_classified = total_within + total_violated
-        percent_total = total_violated / total_classified if total_classified else 0
+        total_classified = denominator.sum()
+        percent_total = violated.sum() / total_classified if total_classified else 0
         
-        percent_values = [
-            f"{value * 100:.1f}%" if pd.notna(value) else "0.0%"
-            for value in percent_row.values
-        ]
-        percent_values.append(f"{percent_total * 100:.1f}%")
+        percent_values = [f"{value * 100:.1f}%" for value in (*percent_row, percent_total)]
         pivot.loc["% Fuera de SLA"] = percent_values
         
         return pivot
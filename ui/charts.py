@@ -62,7 +62,6 @@ class ChartRenderer:
     ) -> pd.DataFrame:
         """Prepare trend data for visualization."""
         if category_col == "Estado de resolucion":
-            df = df.copy()
             # Normalize Estado de resolucion values (already normalized in orchestrator)
             # This is just for consistency if called from elsewhere
             def normalize_resolution_status(value):
@@ -80,13 +79,17 @@ class ChartRenderer:
                 else:
                     return value
             
-            df[category_col] = df[category_col].apply(normalize_resolution_status)
+            codes, statuses = pd.factorize(df[category_col], use_na_sentinel=False)
+            normalized_statuses = pd.Series(statuses).map(normalize_resolution_status)
+            df = df.assign(**{category_col: normalized_statuses.to_numpy()[codes]})
         
         trend = (
-            df.groupby(["Periodo", category_col])["ID del ticket"]
+            df.groupby(["Periodo", category_col], observed=True)["ID del ticket"]
             .nunique()
             .reset_index()
         )
+        if isinstance(trend[category_col].dtype, pd.CategoricalDtype):
+            trend[category_col] = trend[category_col].astype(object)
         
         if selected_year is not None:
             today = pd.Timestamp.today()
@@ -137,12 +140,13 @@ class ChartRenderer:
         self, usage: pd.DataFrame, selected_year: Optional[int]
     ) -> pd.DataFrame:
         """Prepare logins trend data for visualization."""
-        usage = usage.copy()
-        usage["Periodo"] = pd.to_datetime(
-            dict(year=usage["anio"], month=usage["mes_num"], day=1), errors="coerce"
+        usage = usage[["Cliente", "logins"]].assign(
+            Periodo=pd.to_datetime(
+                dict(year=usage["anio"], month=usage["mes_num"], day=1), errors="coerce"
+            )
         )
         trend = (
-            usage.groupby(["Periodo", "Cliente"])["logins"]
+            usage.groupby(["Periodo", "Cliente"], observed=True)["logins"]
             .sum()
             .reset_index()
         )
@@ -5,11 +5,18 @@ from .dashboard_domain import (
 	PRIORITY_LABEL_MAP,
 	PRIORITY_ORDER_MAP,
 	build_commercial_estado,
+	build_commercial_estado_single,
 	build_priority_category_order,
 	map_priority_sort,
 	normalize_priority_labels,
 )
-from .dashboard_rendering import format_numeric_display_table, resolve_comparison_years
+from .dashboard_rendering import (
+	coerce_numeric_table,
+	format_numeric_display_table,
+	resolve_comparison_years,
+	stack_year_tables,
+	style_numeric_display_table,
+)
 from .text_normalizer import TextNormalizer
 
 __all__ = [
@@ -18,6 +25,9 @@ __all__ = [
 	"TeamFilterHelper",
 	"resolve_comparison_years",
 	"format_numeric_display_table",
+	"coerce_numeric_table",
+	"style_numeric_display_table",
+	"stack_year_tables",
 	"PRIORITY_LABEL_MAP",
 	"PRIORITY_ORDER_MAP",
 	"COMMERCIAL_STATUS_ORDER",
@@ -25,4 +35,5 @@ __all__ = [
 	"map_priority_sort",
 	"build_priority_category_order",
 	"build_commercial_estado",
+	"build_commercial_estado_single",
 ]
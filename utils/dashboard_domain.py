@@ -1,6 +1,7 @@
 """Reglas de dominio reutilizables para KPIs de dashboard."""
-from typing import List
+from typing import Callable, List, Optional
 
+import numpy as np
 import pandas as pd
 
 PRIORITY_LABEL_MAP = {
@@ -28,49 +29,60 @@ PRIORITY_ORDER_MAP = {
 COMMERCIAL_STATUS_ORDER = ["Pendiente", "En progreso", "Resuelto"]
 
 
+def _map_priority_uniques(
+    priority_series: pd.Series, transform: Callable[[pd.Series], pd.Series]
+) -> pd.Series:
+    """Normalize each distinct priority value once and broadcast the result back by codes."""
+    codes, uniques = pd.factorize(priority_series, use_na_sentinel=False)
+    priority_norm = pd.Series(uniques).astype(str).str.strip().str.lower()
+    return pd.Series(transform(priority_norm).to_numpy()[codes], index=priority_series.index)
+
+
 def normalize_priority_labels(priority_series: pd.Series) -> pd.Series:
     """Normalize priority values to Spanish criticidad labels."""
-    priority_norm = priority_series.astype(str).str.strip().str.lower()
-    return priority_norm.map(PRIORITY_LABEL_MAP).fillna("Sin criticidad")
+    return _map_priority_uniques(
+        priority_series,
+        lambda priority_norm: priority_norm.map(PRIORITY_LABEL_MAP).fillna("Sin criticidad"),
+    )
 
 
 def build_priority_category_order(priority_labels: pd.Series) -> List[str]:
     """Build sorted category order for priority labels."""
-    labels = priority_labels.astype(str).str.strip()
-    sort_values = labels.str.lower().map(PRIORITY_ORDER_MAP).fillna(99)
-    return (
-        pd.DataFrame(
-            {
-                "label": labels,
-                "sort": sort_values,
-                "tie": labels.str.lower(),
-            }
-        )
-        .drop_duplicates(subset=["label"])
-        .sort_values(by=["sort", "tie"])["label"]
-        .tolist()
-    )
+    labels = dict.fromkeys(str(label).strip() for label in pd.unique(priority_labels))
+    return sorted(labels, key=lambda label: (PRIORITY_ORDER_MAP.get(label.lower(), 99), label.lower()))
 
 
 def map_priority_sort(priority_labels: pd.Series) -> pd.Series:
     """Return numeric sort series for priority labels."""
-    return priority_labels.astype(str).str.strip().str.lower().map(PRIORITY_ORDER_MAP).fillna(99)
+    return _map_priority_uniques(
+        priority_labels,
+        lambda priority_norm: priority_norm.map(PRIORITY_ORDER_MAP).fillna(99),
+    )
+
+
+def build_commercial_estado_single(estado: object) -> Optional[str]:
+    """Map one grouped status label into its commercial status bucket."""
+    estado_norm = "" if pd.isna(estado) else str(estado).strip().lower()
+    if any(token in estado_norm for token in ("resuelto", "cerrado", "solucionado")):
+        return "Resuelto"
+    if "progreso" in estado_norm:
+        return "En progreso"
+    if "pendiente" in estado_norm:
+        return "Pendiente"
+    return None
 
 
 def build_commercial_estado(estado_grouped: pd.Series) -> pd.Series:
-    """Map grouped status into commercial status buckets."""
-    estado_series = estado_grouped.fillna("").astype(str).str.strip().str.lower()
-    estado_comercial = pd.Series(pd.NA, index=estado_grouped.index, dtype="object")
-    estado_comercial = estado_comercial.mask(
-        estado_series.str.contains("pendiente", na=False),
-        "Pendiente",
-    )
-    estado_comercial = estado_comercial.mask(
-        estado_series.str.contains("progreso", na=False),
-        "En progreso",
+    """Map grouped status into commercial status buckets, once per distinct label."""
+    codes, uniques = pd.factorize(estado_grouped, use_na_sentinel=False)
+    bucket_codes = np.array(
+        [
+            COMMERCIAL_STATUS_ORDER.index(bucket) if bucket is not None else -1
+            for bucket in map(build_commercial_estado_single, uniques)
+        ],
+        dtype=np.int8,
     )
-    estado_comercial = estado_comercial.mask(
-        estado_series.eq("resuelto") | estado_series.str.contains("resuelto|cerrado|solucionado", na=False),
-        "Resuelto",
+    estado_comercial = pd.Categorical.from_codes(
+        bucket_codes[codes], categories=COMMERCIAL_STATUS_ORDER
     )
-    return estado_comercial
+    return pd.Series(estado_comercial, index=estado_grouped.index)
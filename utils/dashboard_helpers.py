@@ -1,5 +1,5 @@
 """Utilidades de dominio para dashboard de tickets."""
-from typing import Dict, List, Set, Tuple
+from typing import Callable, Dict, List, Set, Tuple
 
 import pandas as pd
 
@@ -21,8 +21,19 @@ class TicketStatusHelper:
             if str(state).strip()
         }
 
+    @staticmethod
+    def _apply_on_uniques(series: pd.Series, transform: Callable[[pd.Series], pd.Series]) -> pd.Series:
+        """Run a per-value transform once per distinct value and broadcast it back by codes."""
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        transformed = transform(pd.Series(uniques)).to_numpy()
+        return pd.Series(transformed[codes], index=series.index)
+
     def normalize_estado_for_display(self, estado: pd.Series) -> pd.Series:
         """Normalize Estado values to consistent Spanish labels for display."""
+        return self._apply_on_uniques(estado, self._normalize_estado_values).astype("object")
+
+    def _normalize_estado_values(self, estado: pd.Series) -> pd.Series:
+        """Map raw Estado values to Spanish display labels."""
         estado_raw = estado.astype("string").str.strip()
         estado_norm = (
             estado_raw.fillna("")
@@ -90,6 +101,8 @@ class TicketStatusHelper:
 
     def build_estado_grouped(self, df: pd.DataFrame, target_col: str) -> pd.DataFrame:
         """Group all configured resolved states into 'Resuelto'."""
+        if target_col in df.columns:
+            return df
         grouped_df = df.copy()
         if "Estado" not in grouped_df.columns:
             grouped_df[target_col] = pd.NA
@@ -100,16 +113,33 @@ class TicketStatusHelper:
 
     def build_resolved_mask(self, df: pd.DataFrame) -> pd.Series:
         """Build resolved mask using grouped Estado and Estado de resolucion."""
-        resolved_states = self.normalized_resolved_states()
-        grouped_df = self.build_estado_grouped(df, "Estado Agrupado")
-        resolved_estado = grouped_df["Estado Agrupado"].astype(str).str.strip().str.lower().eq("resuelto")
-        resolved_estado_resolucion = grouped_df["Estado de resolucion"].astype(str).str.strip().str.lower().isin(
-            resolved_states
-        )
-        return resolved_estado | resolved_estado_resolucion
+        flag_column = self.config.RESOLVED_FLAG_COLUMN
+        if flag_column in df.columns:
+            return df[flag_column]
+        if "Estado" in df.columns:
+            resolved_estado = self._apply_on_uniques(df["Estado"], self._resolved_estado_flags)
+        else:
+            resolved_estado = pd.Series(False, index=df.index)
+        resolved_estado_resolucion = self._apply_on_uniques(
+            df["Estado de resolucion"],
+            self._resolved_resolution_flags,
+        )
+        return resolved_estado.astype(bool) | resolved_estado_resolucion.astype(bool)
+
+    def _resolved_estado_flags(self, estado: pd.Series) -> pd.Series:
+        """Flag Estado values whose display label is 'Resuelto'."""
+        return self._normalize_estado_values(estado).astype(str).str.strip().str.lower().eq("resuelto")
+
+    def _resolved_resolution_flags(self, resolution: pd.Series) -> pd.Series:
+        """Flag Estado de resolucion values listed as resolved states."""
+        return resolution.astype(str).str.strip().str.lower().isin(self.normalized_resolved_states())
 
     def normalize_resolution_status_for_display(self, resolution: pd.Series) -> pd.Series:
         """Normalize Estado de resolucion values to Spanish labels for display."""
+        return self._apply_on_uniques(resolution, self._normalize_resolution_values).astype("object")
+
+    def _normalize_resolution_values(self, resolution: pd.Series) -> pd.Series:
+        """Map raw Estado de resolucion values to Spanish display labels."""
         resolution_raw = resolution.astype("string").str.strip()
         resolution_norm = (
             resolution_raw.fillna("")
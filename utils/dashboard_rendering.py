@@ -1,6 +1,7 @@
 """Utilidades de render para dashboards Streamlit."""
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 
@@ -10,6 +11,36 @@ def resolve_comparison_years(selected_year: Optional[int]) -> Tuple[int, List[in
     return current_year, [current_year - 1, current_year]
 
 
+def stack_year_tables(year_tables: List[Tuple[int, pd.DataFrame]], index_name: str) -> pd.DataFrame:
+    """Stack per-year tables under '~~ AÑO ~~' header rows in a single frame build."""
+    columns = year_tables[0][1].columns
+    for _, table in year_tables[1:]:
+        columns = columns.union(table.columns, sort=False)
+
+    header_row = np.full((1, len(columns)), pd.NA, dtype=object)
+    blocks: List[np.ndarray] = []
+    labels: List[object] = []
+    for year, table in year_tables:
+        blocks.extend([header_row, table.reindex(columns=columns).to_numpy(dtype=object)])
+        labels.append(f"~~ AÑO {year} ~~")
+        labels.extend(table.index.tolist())
+    return pd.DataFrame(
+        np.concatenate(blocks),
+        index=pd.Index(labels, dtype=object, name=index_name),
+        columns=columns,
+    )
+
+
+def coerce_numeric_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Coerce every column to numeric, turning labels and header blanks into NaN."""
+    return table.apply(pd.to_numeric, errors="coerce")
+
+
+def style_numeric_display_table(table: pd.DataFrame) -> "pd.io.formats.style.Styler":
+    """Attach locale-friendly number formatting that Streamlit applies at render time."""
+    return table.style.format(precision=0, thousands=".", decimal=",", na_rep="")
+
+
 def format_numeric_display_table(
     table: pd.DataFrame,
     *,
@@ -17,19 +48,27 @@ def format_numeric_display_table(
     replace_comma_with_dot: bool = True,
 ) -> pd.DataFrame:
     """Format table values for Streamlit display with locale-friendly separators."""
-    display_source = table.copy()
-    if coerce_numeric:
-        display_source[display_source.columns] = display_source[display_source.columns].apply(
-            pd.to_numeric,
-            errors="coerce",
-        )
+    display_source = coerce_numeric_table(table) if coerce_numeric else table
 
     def _format_value(value: object) -> str:
-        if pd.isna(value):
-            return ""
         if isinstance(value, (int, float)) and not isinstance(value, bool):
             rendered = f"{value:,.0f}"
             return rendered.replace(",", ".") if replace_comma_with_dot else rendered
         return str(value)
 
-    return display_source.apply(lambda col: col.map(_format_value))
+    formatted = pd.DataFrame(
+        {
+            position: _format_unique_values(display_source.iloc[:, position], _format_value)
+            for position in range(display_source.shape[1])
+        },
+        index=display_source.index,
+    )
+    formatted.columns = display_source.columns
+    return formatted
+
+
+def _format_unique_values(column: pd.Series, format_value: Callable[[object], str]) -> np.ndarray:
+    """Format each distinct value once and broadcast by codes (missing values render empty)."""
+    codes, uniques = pd.factorize(column)
+    rendered = np.array([format_value(value) for value in uniques.tolist()] + [""], dtype=object)
+    return rendered[codes]
@@ -46,8 +46,12 @@ class TextNormalizer:
     
     @staticmethod
     def clean_text_series(data: pd.Series) -> pd.Series:
-        """Clean text column values."""
-        cleaned = data.astype(str).str.strip()
+        """Clean text column values (Arrow-backed so strip runs in Arrow compute kernels)."""
+        cleaned = data.astype(pd.StringDtype("pyarrow")).str.strip()
+        missing = data.isna().to_numpy(dtype=bool)
+        if missing.any():
+            # Keep str() labels for missing markers ("None", "<NA>", "NaT"); only NaN turns into NA below.
+            cleaned[missing] = data[missing].astype(object).map(str).to_numpy()
         cleaned = cleaned.replace("nan", pd.NA)
         return cleaned
 